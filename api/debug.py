@@ -1,7 +1,15 @@
-"""Testa imports um por um para identificar qual está falhando."""
+"""
+Testa imports um por um para identificar qual está falhando.
+
+Os imports rodam a cada GET, não no carregamento do módulo, para que o cold
+start desta função não pague por supabase, bs4 etc. Cada um leva o tempo de
+import em ms (0 quando outro handler na mesma instância já o importou).
+"""
 import sys
 import os
+import importlib
 import json
+import time
 import traceback
 from http.server import BaseHTTPRequestHandler
 
@@ -10,56 +18,39 @@ ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-results = {}
-
-try:
-    from supabase import create_client
-    results["supabase"] = "ok"
-except Exception as e:
-    results["supabase"] = str(e)
-
-try:
-    from bs4 import BeautifulSoup
-    results["beautifulsoup4"] = "ok"
-except Exception as e:
-    results["beautifulsoup4"] = str(e)
-
-try:
-    import requests
-    results["requests"] = "ok"
-except Exception as e:
-    results["requests"] = str(e)
-
-try:
-    from lib.classifier import classify_article
-    results["lib.classifier"] = "ok"
-except Exception as e:
-    results["lib.classifier"] = str(e)
-
-try:
-    from lib.filter import is_violent_content
-    results["lib.filter"] = "ok"
-except Exception as e:
-    results["lib.filter"] = str(e)
-
-try:
-    from lib.supabase_client import get_client
-    results["lib.supabase_client"] = "ok"
-except Exception as e:
-    results["lib.supabase_client"] = str(e)
-
-try:
-    from lib.scraper_base import BaseScraper
-    results["lib.scraper_base"] = "ok"
-except Exception as e:
-    results["lib.scraper_base"] = str(e)
-
-results["sys_path_root"] = ROOT
-results["cwd"] = os.getcwd()
+# Nome no relatório -> módulo importado.
+MODULES = {
+    "supabase": "supabase",
+    "beautifulsoup4": "bs4",
+    "lxml": "lxml.etree",
+    "selectolax": "selectolax.lexbor",
+    "requests": "requests",
+    "lib.classifier": "lib.classifier",
+    "lib.filter": "lib.filter",
+    "lib.supabase_client": "lib.supabase_client",
+    "lib.scraper_base": "lib.scraper_base",
+    "lib.registry": "lib.registry",
+}
+
+
+def check_imports() -> dict:
+    results = {}
+    for name, module in MODULES.items():
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module)
+            results[name] = f"ok ({(time.perf_counter() - start) * 1000:.0f} ms)"
+        except Exception as e:
+            results[name] = str(e)
+            traceback.print_exc()
+    results["sys_path_root"] = ROOT
+    results["cwd"] = os.getcwd()
+    return results
 
 
 class Handler(BaseHTTPRequestHandler):
     def do_GET(self):
+        results = check_imports()
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
         self.end_headers()
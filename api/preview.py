@@ -4,40 +4,23 @@ Retorna o que seria publicado: título, URL, categoria, status do filtro.
 
 GET /api/preview           → testa todos os 7 sites
 GET /api/preview?site=tnh1 → testa um site específico
+GET /api/preview?site=tnh1&profile=1 → inclui o perfil de CPU da execução
+                                        (profile=memory: também alocações, bem mais lento)
 """
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
-import time
+from contextlib import nullcontext
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
-import requests as http_requests
-from bs4 import BeautifulSoup
-
 from lib.classifier import classify_article
 from lib.filter import is_violent_content, DEFAULT_BLACKLIST
-from lib.supabase_client import is_url_published
-from lib.scraper_base import fetch_page
-
-from api.scrape.cadaminuto    import CadaMinutoScraper
-from api.scrape.tnh1          import TNH1Scraper
-from api.scrape.gazetaweb     import GazetaWebScraper
-from api.scrape.tribunahoje   import TribunaHojeScraper
-from api.scrape.jornaldealagoas import JornalDeAlagoasScraper
-from api.scrape.alagoas24horas  import Alagoas24HorasScraper
-from api.scrape.agoraalagoas    import AgoraAlagoasScraper
-
-SCRAPERS = {
-    "cadaminuto":    CadaMinutoScraper,
-    "tnh1":          TNH1Scraper,
-    "gazetaweb":     GazetaWebScraper,
-    "tribunahoje":   TribunaHojeScraper,
-    "jornaldealagoas": JornalDeAlagoasScraper,
-    "alagoas24horas":  Alagoas24HorasScraper,
-    "agoraalagoas":    AgoraAlagoasScraper,
-}
+from lib.profiling import profiler_for
+from lib.registry import SITE_KEYS, load_scraper
+from lib.story_dedup import find_duplicate
+from lib.supabase_client import get_published_urls
 
 
 def preview_scraper(scraper_cls, max_articles: int = 5) -> dict:
@@ -50,32 +33,38 @@ def preview_scraper(scraper_cls, max_articles: int = 5) -> dict:
         "error": None,
     }
     try:
-        soup = fetch_page(scraper.listing_url)
-        if soup is None:
+        # The same feed-first listing as a real run, but unconditional: a
+        # preview must show the listing even when a run just handled it.
+        listing = scraper.fetch_listing(conditional=False)
+        if listing is None:
             result["error"] = "Failed to fetch listing page"
             return result
 
-        links = scraper.get_article_links(soup)
+        links, prefetched = scraper.read_listing(listing)
+        result["listing_url"] = listing.url
         result["links_found"] = len(links)
+        published = get_published_urls(links[:max_articles]) if links else set()
 
         for link in links[:max_articles]:
             entry = {"url": link, "status": None, "title": None, "category": None, "reason": None}
             try:
-                if is_url_published(link):
+                if link in published:
                     entry["status"] = "skip"
                     entry["reason"] = "already published"
                     result["articles"].append(entry)
                     continue
 
-                time.sleep(0.8)
-                article_soup = fetch_page(link)
-                if article_soup is None:
-                    entry["status"] = "skip"
-                    entry["reason"] = "fetch failed"
-                    result["articles"].append(entry)
-                    continue
+                article = prefetched.get(link)
+                entry["source"] = "feed" if article is not None else "page"
+                if article is None:
+                    article_soup = scraper.fetch(link)
+                    if article_soup is None:
+                        entry["status"] = "skip"
+                        entry["reason"] = "fetch failed"
+                        result["articles"].append(entry)
+                        continue
+                    article = scraper.parse_article(article_soup, link)
 
-                article = scraper.parse_article(article_soup, link)
                 if article is None:
                     entry["status"] = "skip"
                     entry["reason"] = "parse failed"
@@ -87,6 +76,13 @@ def preview_scraper(scraper_cls, max_articles: int = 5) -> dict:
                 if is_violent_content(article.title, article.body, DEFAULT_BLACKLIST):
                     entry["status"] = "filtered"
                     entry["reason"] = "violence/police content"
+                    result["articles"].append(entry)
+                    continue
+
+                _, duplicate = find_duplicate(link, article.title, article.body)
+                if duplicate is not None:
+                    entry["status"] = "skip"
+                    entry["reason"] = f"duplicate of {duplicate.source_site}: {duplicate.url}"
                 else:
                     entry["status"] = "would_publish"
                     entry["category"] = classify_article(
@@ -114,18 +110,24 @@ class Handler(BaseHTTPRequestHandler):
         site_filter = qs.get("site", [None])[0]
 
         if site_filter:
-            if site_filter not in SCRAPERS:
-                self._respond(400, {"error": f"Unknown site. Options: {list(SCRAPERS.keys())}"})
+            if site_filter not in SITE_KEYS:
+                self._respond(400, {"error": f"Unknown site. Options: {list(SITE_KEYS)}"})
                 return
-            scrapers_to_run = {site_filter: SCRAPERS[site_filter]}
+            # Only the requested site's module gets imported.
+            keys_to_run = [site_filter]
         else:
-            scrapers_to_run = SCRAPERS
+            keys_to_run = SITE_KEYS
 
+        profiler = profiler_for(qs.get("profile", [None])[0])
         results = []
-        for key, cls in scrapers_to_run.items():
-            results.append(preview_scraper(cls, max_articles=5))
-
-        self._respond(200, {"preview": results, "total_sites": len(results)})
+        with profiler or nullcontext():
+            for key in keys_to_run:
+                results.append(preview_scraper(load_scraper(key), max_articles=5))
+
+        data = {"preview": results, "total_sites": len(results)}
+        if profiler is not None:
+            data["profile"] = profiler.report()
+        self._respond(200, data)
 
     def _respond(self, code: int, data: dict) -> None:
         body = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
@@ -3,10 +3,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import json
 import re
-from http.server import BaseHTTPRequestHandler
-from bs4 import BeautifulSoup
 
+from lib.parsing import Document
 from lib.scraper_base import BaseScraper, Article
+from lib.site_handler import ScraperHandler
 
 BASE = "https://agoraalagoas.com"
 
@@ -14,56 +14,44 @@ BASE = "https://agoraalagoas.com"
 class AgoraAlagoasScraper(BaseScraper):
     """
     Agora Alagoas usa Elementor (renderização JS).
-    O HTML estático retorna metadados schema.org com as URLs dos artigos — usamos isso.
+    O HTML estático retorna metadados schema.org com as URLs dos artigos — usamos isso
+    quando a API REST do WordPress e o feed não respondem.
     """
     site_name = "agoraalagoas.com"
     listing_url = "https://agoraalagoas.com/"
-
-    def get_article_links(self, soup: BeautifulSoup) -> list[str]:
-        links = []
+    feed_urls = (
+        f"{BASE}/wp-json/wp/v2/posts?per_page=20&_embed=wp:featuredmedia",
+        f"{BASE}/feed/",
+    )
+    listing_tags = ("a", "script")
+    # Qualquer página do site com caminho de mais de 5 caracteres (a home e as
+    # âncoras ficam de fora), menos as institucionais.
+    link_pattern = re.compile(r"agoraalagoas\.com/.{6,}")
+    link_exclude = re.compile(r"sobre|contato|anuncie|whatsapp")
+
+    def get_article_links(self, soup: Document) -> list[str]:
+        collector = self.link_collector()
 
         # Estratégia 1: schema.org JSON-LD com lista de artigos
-        import json as _json
         for script in soup.select("script[type='application/ld+json']"):
             try:
-                data = _json.loads(script.string or "")
+                data = json.loads(script.string or "")
                 # Pode ser lista ou objeto único
                 items = data if isinstance(data, list) else [data]
                 for item in items:
-                    url = item.get("url") or item.get("@id") or ""
-                    if "agoraalagoas.com" in str(url) and len(str(url)) > 30:
-                        if url not in links:
-                            links.append(url)
+                    collector.add(item.get("url") or item.get("@id") or "")
                     # ItemList entries
                     for entry in item.get("itemListElement", []):
-                        u = entry.get("url") or entry.get("item", {}).get("url") or ""
-                        if "agoraalagoas.com" in str(u) and len(str(u)) > 30:
-                            if u not in links:
-                                links.append(u)
+                        collector.add(entry.get("url") or entry.get("item", {}).get("url") or "")
             except Exception:
                 pass
 
         # Estratégia 2: links com padrão de post WordPress (?p=ID ou /slug/)
-        if not links:
-            for a in soup.select("a[href]"):
-                href = a.get("href", "")
-                if not isinstance(href, str):
-                    continue
-                if href.startswith("/"):
-                    href = BASE + href
-                if (
-                    "agoraalagoas.com" in href
-                    and not any(x in href for x in ["#", "sobre", "contato", "anuncie", "whatsapp"])
-                    and len(href) > 30
-                ):
-                    if href not in links:
-                        links.append(href)
-
-        # Remove páginas de navegação e âncoras
-        links = [l for l in links if "#" not in l and not l.rstrip("/") == BASE]
-        return links[:20]
-
-    def parse_article(self, soup: BeautifulSoup, url: str) -> Article | None:
+        if not collector.links:
+            return super().get_article_links(soup)
+        return collector.links
+
+    def parse_article(self, soup: Document, url: str) -> Article | None:
         title_el = soup.select_one("h1") or soup.select_one("h2.entry-title") or soup.select_one("h2")
         if not title_el:
             return None
@@ -91,7 +79,9 @@ class AgoraAlagoasScraper(BaseScraper):
         return Article(url=url, title=title, body=body, image_url=image_url, first_paragraph=first_para)
 
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(ScraperHandler):
+    scraper_cls = AgoraAlagoasScraper
+
     def do_GET(self):
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
@@ -3,10 +3,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import json
 import re
-from http.server import BaseHTTPRequestHandler
-from bs4 import BeautifulSoup
 
+from lib.parsing import Document
 from lib.scraper_base import BaseScraper, Article
+from lib.site_handler import ScraperHandler
 
 BASE = "https://www.alagoas24horas.com.br"
 
@@ -14,22 +14,14 @@ BASE = "https://www.alagoas24horas.com.br"
 class Alagoas24HorasScraper(BaseScraper):
     site_name = "alagoas24horas.com.br"
     listing_url = "https://www.alagoas24horas.com.br/"
+    # Pattern: /NNNNNN/ or /NNNNNN/slug/
+    link_pattern = re.compile(r"alagoas24horas\.com\.br(?:/.*)?/\d{6,7}(?:/|$)")
+    feed_urls = (
+        f"{BASE}/wp-json/wp/v2/posts?per_page=20&_embed=wp:featuredmedia",
+        f"{BASE}/feed/",
+    )
 
-    def get_article_links(self, soup: BeautifulSoup) -> list[str]:
-        links = []
-        for a in soup.select("a[href]"):
-            href = a.get("href", "")
-            if not isinstance(href, str):
-                continue
-            if href.startswith("/") and re.match(r"^/\d{6,7}(/|$)", href):
-                href = BASE + href
-            # Pattern: /NNNNNN/ or /NNNNNN/slug/
-            if "alagoas24horas.com.br" in href and re.search(r"/\d{6,7}(/|$)", href):
-                if href not in links:
-                    links.append(href)
-        return links[:20]
-
-    def parse_article(self, soup: BeautifulSoup, url: str) -> Article | None:
+    def parse_article(self, soup: Document, url: str) -> Article | None:
         title_el = soup.select_one("h1")
         if not title_el:
             return None
@@ -62,7 +54,9 @@ class Alagoas24HorasScraper(BaseScraper):
         return Article(url=url, title=title, body=body, image_url=image_url, first_paragraph=first_para)
 
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(ScraperHandler):
+    scraper_cls = Alagoas24HorasScraper
+
     def do_GET(self):
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
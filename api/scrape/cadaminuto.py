@@ -2,26 +2,19 @@ import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import json
-from http.server import BaseHTTPRequestHandler
-from bs4 import BeautifulSoup
+import re
 
+from lib.parsing import Document
 from lib.scraper_base import BaseScraper, Article
+from lib.site_handler import ScraperHandler
 
 
 class CadaMinutoScraper(BaseScraper):
     site_name = "cadaminuto.com.br"
     listing_url = "https://www.cadaminuto.com.br/"
+    link_pattern = re.compile(r"cadaminuto\.com\.br(?:/.*)?/noticia/")
 
-    def get_article_links(self, soup: BeautifulSoup) -> list[str]:
-        links = []
-        for a in soup.select("a[href]"):
-            href = a.get("href", "")
-            if isinstance(href, str) and "/noticia/" in href and "cadaminuto.com.br" in href:
-                if href not in links:
-                    links.append(href)
-        return links[:20]
-
-    def parse_article(self, soup: BeautifulSoup, url: str) -> Article | None:
+    def parse_article(self, soup: Document, url: str) -> Article | None:
         # cadaminuto uses h2 for article title, not h1
         title_el = (
             soup.select_one("h2.font-bold")
@@ -55,7 +48,9 @@ class CadaMinutoScraper(BaseScraper):
         return Article(url=url, title=title, body=body, image_url=image_url, first_paragraph=first_para)
 
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(ScraperHandler):
+    scraper_cls = CadaMinutoScraper
+
     def do_GET(self):
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
@@ -3,10 +3,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import json
 import re
-from http.server import BaseHTTPRequestHandler
-from bs4 import BeautifulSoup
 
+from lib.parsing import Document
 from lib.scraper_base import BaseScraper, Article
+from lib.site_handler import ScraperHandler
 
 BASE = "https://www.gazetaweb.com"
 
@@ -14,22 +14,10 @@ BASE = "https://www.gazetaweb.com"
 class GazetaWebScraper(BaseScraper):
     site_name = "gazetaweb.com"
     listing_url = "https://www.gazetaweb.com/"
+    # Article URLs end with a 6-digit numeric ID
+    link_pattern = re.compile(r"/noticias/.*-\d{5,7}$")
 
-    def get_article_links(self, soup: BeautifulSoup) -> list[str]:
-        links = []
-        for a in soup.select("a[href]"):
-            href = a.get("href", "")
-            if not isinstance(href, str):
-                continue
-            if href.startswith("/noticias/"):
-                href = BASE + href
-            # Article URLs end with a 6-digit numeric ID
-            if "/noticias/" in href and re.search(r"-\d{5,7}$", href):
-                if href not in links:
-                    links.append(href)
-        return links[:20]
-
-    def parse_article(self, soup: BeautifulSoup, url: str) -> Article | None:
+    def parse_article(self, soup: Document, url: str) -> Article | None:
         title_el = (
             soup.select_one(".gzw-article h1")
             or soup.select_one("header h1")
@@ -60,7 +48,9 @@ class GazetaWebScraper(BaseScraper):
         return Article(url=url, title=title, body=body, image_url=image_url, first_paragraph=first_para)
 
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(ScraperHandler):
+    scraper_cls = GazetaWebScraper
+
     def do_GET(self):
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
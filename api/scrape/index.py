@@ -1,51 +1,122 @@
 """
-Orchestrator — chama cada scraper sequencialmente.
+Orchestrator — dispara os scrapers em paralelo, um worker por site.
 Recebe as credenciais do WordPress via payload (enviadas pelo plugin WP).
+
+Com SCRAPE_FANOUT_URL (ex.: https://meu-projeto.vercel.app/api/scrape) cada site
+roda na sua própria invocação (POST /api/scrape/<site>), cada uma com seus 60s,
+e aqui só se agregam os resultados.
 """
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from http.server import BaseHTTPRequestHandler
 
-from api.scrape.cadaminuto import CadaMinutoScraper
-from api.scrape.tnh1 import TNH1Scraper
-from api.scrape.gazetaweb import GazetaWebScraper
-from api.scrape.tribunahoje import TribunaHojeScraper
-from api.scrape.jornaldealagoas import JornalDeAlagoasScraper
-from api.scrape.alagoas24horas import Alagoas24HorasScraper
-from api.scrape.agoraalagoas import AgoraAlagoasScraper
-from lib.supabase_client import get_filter_keywords
-
-SCRAPERS = [
-    CadaMinutoScraper,
-    TNH1Scraper,
-    GazetaWebScraper,
-    TribunaHojeScraper,
-    JornalDeAlagoasScraper,
-    Alagoas24HorasScraper,
-    AgoraAlagoasScraper,
-]
+from lib.auth import bearer_token
+from lib.http_session import connection_stats, get_session
+from lib.registry import SITE_KEYS, SITE_NAMES, load_scrapers
+from lib.scheduler import DEFAULT_TIME_BUDGET, Deadline
+from lib.seen_index import merge_stats
+from lib.site_handler import load_schedules
+from lib.supabase_client import get_filter_keywords, seen_index_stats
 
 REQUIRED_CREDENTIALS = {"wp_url", "wp_username", "wp_app_password"}
 
+FANOUT_URL = os.environ.get("SCRAPE_FANOUT_URL", "")
+# Time the fanned-out invocations leave us to collect their answers.
+_FANOUT_MARGIN = 5.0
+
+
+def _run_remote(key: str, credentials: dict, auth_token: str, deadline: Deadline, profile: bool | str) -> dict:
+    budget = max(1.0, deadline.remaining() - _FANOUT_MARGIN)
+    resp = get_session().post(
+        f"{FANOUT_URL.rstrip('/')}/{key}",
+        json={**credentials, "budget": budget, "profile": profile},
+        headers={"Authorization": f"Bearer {auth_token}"},
+        timeout=(5, budget + _FANOUT_MARGIN),
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _fan_out(credentials: dict, auth_token: str, deadline: Deadline, max_workers: int | None, profile: bool | str) -> dict:
+    # Only site keys are needed here: the scrapers themselves are imported by
+    # the invocations that run them.
+    entries: dict[str, dict] = {}
+    connections: dict[str, dict[str, int]] = {}
+    seen_indexes: list[dict] = []
+    with ThreadPoolExecutor(max_workers=max_workers or len(SITE_KEYS)) as pool:
+        futures = {
+            pool.submit(_run_remote, key, credentials, auth_token, deadline, profile): key
+            for key in SITE_KEYS
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                data = future.result()
+                entries[key] = data["results"][0]
+                # The orchestrator only waits here; the work is profiled remotely.
+                if "profile" in data:
+                    entries[key]["profile"] = data["profile"]
+                for host, counts in data.get("connections", {}).items():
+                    total = connections.setdefault(host, {})
+                    for name, value in counts.items():
+                        total[name] = total.get(name, 0) + value
+                seen_indexes.append(data.get("seen_index") or {})
+            except Exception as exc:
+                entries[key] = {"site": SITE_NAMES[key], "error": str(exc)}
+    return {
+        "results": [entries[key] for key in SITE_KEYS],
+        "connections": connections,
+        "seen_index": merge_stats(seen_indexes),
+    }
+
+
+def run_all(
+    credentials: dict,
+    max_workers: int | None = None,
+    budget: float | None = None,
+    auth_token: str = "",
+    profile: bool | str = False,
+) -> dict:
+    """`profile` only matters with SCRAPE_FANOUT_URL: it asks each site's invocation for its profile."""
+    deadline = Deadline(budget or DEFAULT_TIME_BUDGET)
+    if FANOUT_URL:
+        return _fan_out(credentials, auth_token, deadline, max_workers, profile)
 
-def run_all(credentials: dict) -> dict:
+    connections = connection_stats()
+    scrapers = load_scrapers()
     blacklist = get_filter_keywords()
-    summary = []
-    for scraper_cls in SCRAPERS:
-        try:
-            result = scraper_cls().run(credentials=credentials, blacklist=blacklist)
-            summary.append({
-                "site": result.source_site,
-                "found": result.articles_found,
-                "published": result.articles_published,
-                "filtered": result.articles_filtered,
-                "error": result.error,
-            })
-        except Exception as exc:
-            summary.append({"site": scraper_cls.site_name, "error": str(exc)})
-    return {"results": summary}
+    schedules = load_schedules([cls.site_name for cls in scrapers], deadline)
+    # Each site has its own host (and therefore its own token bucket), so the
+    # scrapers run side by side; the summary keeps the registry order.
+    # Articles are not ordered freshest-first across sites: every site spends
+    # the shared deadline on its own listing, newest links first. HTML
+    # listings carry no publish time to compare sites by, and a global order
+    # would hold every article back until the slowest listing came in.
+    entries: dict[type, dict] = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(scrapers)) as pool:
+        futures = {
+            pool.submit(
+                scraper_cls().run,
+                credentials=credentials,
+                blacklist=blacklist,
+                schedule=schedules[scraper_cls.site_name],
+            ): scraper_cls
+            for scraper_cls in scrapers
+        }
+        for future in as_completed(futures):
+            scraper_cls = futures[future]
+            try:
+                entries[scraper_cls] = future.result().summary()
+            except Exception as exc:
+                entries[scraper_cls] = {"site": scraper_cls.site_name, "error": str(exc)}
+    return {
+        "results": [entries[scraper_cls] for scraper_cls in scrapers],
+        "connections": connection_stats(since=connections),
+        "seen_index": seen_index_stats(),
+    }
 
 
 class Handler(BaseHTTPRequestHandler):
@@ -61,7 +132,7 @@ class Handler(BaseHTTPRequestHandler):
             self.wfile.write(json.dumps({"error": f"Missing fields: {missing}"}).encode())
             return
 
-        data = run_all(credentials=body)
+        data = run_all(credentials=body, auth_token=bearer_token(dict(self.headers)))
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
         self.end_headers()
@@ -3,10 +3,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import json
 import re
-from http.server import BaseHTTPRequestHandler
-from bs4 import BeautifulSoup
 
+from lib.parsing import Document
 from lib.scraper_base import BaseScraper, Article
+from lib.site_handler import ScraperHandler
 
 BASE = "https://www.jornaldealagoas.com.br"
 
@@ -14,22 +14,12 @@ BASE = "https://www.jornaldealagoas.com.br"
 class JornalDeAlagoasScraper(BaseScraper):
     site_name = "jornaldealagoas.com.br"
     listing_url = "https://jornaldealagoas.com.br/"
+    # Relative links have always been published under the www host.
+    link_base = BASE
+    # Pattern: /category/YYYY/MM/DD/ID-slug
+    link_pattern = re.compile(r"jornaldealagoas\.com\.br(?:/.*)?/20\d{2}/\d{2}/\d{2}/")
 
-    def get_article_links(self, soup: BeautifulSoup) -> list[str]:
-        links = []
-        for a in soup.select("a[href]"):
-            href = a.get("href", "")
-            if not isinstance(href, str):
-                continue
-            if href.startswith("/") and re.search(r"/20\d{2}/\d{2}/\d{2}/", href):
-                href = BASE + href
-            # Pattern: /category/YYYY/MM/DD/ID-slug
-            if "jornaldealagoas.com.br" in href and re.search(r"/20\d{2}/\d{2}/\d{2}/", href):
-                if href not in links:
-                    links.append(href)
-        return links[:20]
-
-    def parse_article(self, soup: BeautifulSoup, url: str) -> Article | None:
+    def parse_article(self, soup: Document, url: str) -> Article | None:
         title_el = soup.select_one("h1.news-header__title")
         if not title_el:
             return None
@@ -56,7 +46,9 @@ class JornalDeAlagoasScraper(BaseScraper):
         return Article(url=url, title=title, body=body, image_url=image_url, first_paragraph=first_para)
 
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(ScraperHandler):
+    scraper_cls = JornalDeAlagoasScraper
+
     def do_GET(self):
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
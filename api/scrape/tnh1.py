@@ -2,10 +2,11 @@ import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import json
-from http.server import BaseHTTPRequestHandler
-from bs4 import BeautifulSoup
+import re
 
+from lib.parsing import Document
 from lib.scraper_base import BaseScraper, Article
+from lib.site_handler import ScraperHandler
 
 BASE = "https://tnh1.com.br"
 
@@ -13,22 +14,9 @@ BASE = "https://tnh1.com.br"
 class TNH1Scraper(BaseScraper):
     site_name = "tnh1.com.br"
     listing_url = "https://tnh1.com.br/"
+    link_pattern = re.compile(r"/noticia/nid/")
 
-    def get_article_links(self, soup: BeautifulSoup) -> list[str]:
-        links = []
-        for a in soup.select("a[href]"):
-            href = a.get("href", "")
-            if not isinstance(href, str):
-                continue
-            # Normalise relative URLs
-            if href.startswith("/noticia/nid/"):
-                href = BASE + href
-            if "/noticia/nid/" in href:
-                if href not in links:
-                    links.append(href)
-        return links[:20]
-
-    def parse_article(self, soup: BeautifulSoup, url: str) -> Article | None:
+    def parse_article(self, soup: Document, url: str) -> Article | None:
         title_el = soup.select_one("h1")
         if not title_el:
             return None
@@ -62,7 +50,9 @@ class TNH1Scraper(BaseScraper):
         return Article(url=url, title=title, body=body, image_url=image_url, first_paragraph=first_para)
 
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(ScraperHandler):
+    scraper_cls = TNH1Scraper
+
     def do_GET(self):
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
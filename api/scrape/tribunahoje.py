@@ -3,10 +3,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import json
 import re
-from http.server import BaseHTTPRequestHandler
-from bs4 import BeautifulSoup
 
+from lib.parsing import Document
 from lib.scraper_base import BaseScraper, Article
+from lib.site_handler import ScraperHandler
 
 BASE = "https://tribunahoje.com"
 
@@ -14,22 +14,10 @@ BASE = "https://tribunahoje.com"
 class TribunaHojeScraper(BaseScraper):
     site_name = "tribunahoje.com"
     listing_url = "https://tribunahoje.com/"
+    # Article URLs: /noticias/category/YYYY/MM/DD/ID-slug
+    link_pattern = re.compile(r"/noticias/.*/20\d{2}/\d{2}/\d{2}/")
 
-    def get_article_links(self, soup: BeautifulSoup) -> list[str]:
-        links = []
-        for a in soup.select("a[href]"):
-            href = a.get("href", "")
-            if not isinstance(href, str):
-                continue
-            if href.startswith("/noticias/"):
-                href = BASE + href
-            # Article URLs: /noticias/category/YYYY/MM/DD/ID-slug
-            if "/noticias/" in href and re.search(r"/20\d{2}/\d{2}/\d{2}/", href):
-                if href not in links:
-                    links.append(href)
-        return links[:20]
-
-    def parse_article(self, soup: BeautifulSoup, url: str) -> Article | None:
+    def parse_article(self, soup: Document, url: str) -> Article | None:
         # Real article title is in h1.news-header__title (h1 alone picks up category name)
         title_el = soup.select_one("h1.news-header__title")
         if not title_el:
@@ -59,7 +47,9 @@ class TribunaHojeScraper(BaseScraper):
         return Article(url=url, title=title, body=body, image_url=image_url, first_paragraph=first_para)
 
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(ScraperHandler):
+    scraper_cls = TribunaHojeScraper
+
     def do_GET(self):
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
@@ -7,8 +7,20 @@ Body JSON: {
     "wp_url": "https://meusite.com",
     "wp_username": "admin",
     "wp_app_password": "xxxx xxxx xxxx xxxx",
-    "post_status": "publish"   (opcional, default: publish)
+    "post_status": "publish",  (opcional, default: publish)
+    "profile": false           (opcional: true ou "memory", ver /api/webhook/run)
 }
+
+Responde 202 na hora: {"job_id": "...", "status": "queued", "status_url": "/api/webhook/status?id=..."}.
+O scraping roda em outra invocação (/api/webhook/run); o plugin consulta o
+resultado em status_url com o mesmo Bearer token. O endereço do run vem de
+JOB_RUNNER_URL ou, sem ele, de VERCEL_URL (definida pela própria Vercel), nunca
+do header Host da requisição. Se o run recusar o job (401 da proteção de
+deploy, 404 de URL errada, 400...), o job é marcado como falho com a resposta
+dele; se o run não puder ser alcançado ou não houver URL configurada, o job
+roda aqui mesmo — e na Vercel, que só entrega a resposta quando o handler
+termina, o plugin fica esperando a execução inteira.
+JOB_RUNNER=inline executa o job no próprio processo depois da resposta (dev/testes).
 """
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -17,20 +29,65 @@ import json
 import os as _os
 from http.server import BaseHTTPRequestHandler
 
-from api.scrape.index import run_all
+from lib.auth import authenticate, bearer_token, secret_hash
+from lib.jobs import QUEUED, get_job_store
 
 REQUIRED_FIELDS = {"wp_url", "wp_username", "wp_app_password"}
 
+# Only wait for the request to be delivered, not for the run itself: a run
+# that started is still busy when the read timeout fires, so any answer
+# within it is a refusal.
+DISPATCH_TIMEOUT = (5, 1)
+
+
+def _runner_url() -> str | None:
+    if _os.environ.get("JOB_RUNNER_URL"):
+        return _os.environ["JOB_RUNNER_URL"]
+    if _os.environ.get("VERCEL_URL"):
+        return f"https://{_os.environ['VERCEL_URL']}/api/webhook/run"
+    return None
 
-def _authenticate(headers: dict, api_secret: str | None) -> bool:
+
+def _dispatch(job_id: str, credentials: dict, token: str, profile: bool | str = False) -> None:
     """
-    Valida o Bearer token enviado pelo plugin WP.
-    Se o plugin não configurou api_secret, aceita qualquer requisição.
+    Start the job in its own invocation; run it here if that cannot be
+    reached, and fail it if that answers with an error.
     """
-    if not api_secret:
-        return True
-    auth = headers.get("authorization") or headers.get("Authorization", "")
-    return auth == f"Bearer {api_secret}"
+    import requests
+    from lib.http_session import get_session
+
+    url = _runner_url()
+    if _os.environ.get("JOB_RUNNER") == "inline" or url is None:
+        _run_inline(job_id, credentials, token, profile)
+        return
+    try:
+        resp = get_session().post(
+            url,
+            json={"job_id": job_id, **credentials, "profile": profile},
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=DISPATCH_TIMEOUT,
+        )
+    except requests.exceptions.ReadTimeout:
+        return
+    except Exception as exc:
+        print(f"[webhook] Could not reach {url} ({exc}); running job {job_id} inline")
+        _run_inline(job_id, credentials, token, profile)
+        return
+    if not resp.ok:
+        error = f"Job runner {url} answered {resp.status_code}: {resp.text[:200]}"
+        print(f"[webhook] {error}")
+        try:
+            get_job_store().fail(job_id, error)
+        except Exception as exc:
+            print(f"[webhook] Could not mark job {job_id} as failed: {exc}")
+
+
+def _run_inline(job_id: str, credentials: dict, token: str, profile: bool | str) -> None:
+    # The scraping stack is only imported by invocations that run the job
+    # themselves, so receiving stays a cheap cold start.
+    from api.webhook.run import run_job
+
+    run_job(job_id, credentials, token, profile)
 
 
 class Handler(BaseHTTPRequestHandler):
@@ -44,7 +101,7 @@ class Handler(BaseHTTPRequestHandler):
 
         # Valida o secret key enviado no header com o que veio no body
         api_secret = body.get("api_secret_key") or _os.environ.get("API_SECRET_KEY", "")
-        if not _authenticate(dict(self.headers), api_secret):
+        if not authenticate(dict(self.headers), api_secret):
             self._respond(401, {"error": "Unauthorized"})
             return
 
@@ -60,17 +117,32 @@ class Handler(BaseHTTPRequestHandler):
             "post_status": body.get("post_status", "publish"),
         }
 
+        token = bearer_token(dict(self.headers))
         try:
-            data = run_all(credentials=credentials)
-            self._respond(200, data)
+            job_id = get_job_store().create(secret_hash(token))
         except Exception as exc:
             self._respond(500, {"error": str(exc)})
+            return
+
+        self._respond(202, {
+            "job_id": job_id,
+            "status": QUEUED,
+            "status_url": f"/api/webhook/status?id={job_id}",
+        })
+        _dispatch(job_id, credentials, token, body.get("profile") or False)
 
     def do_GET(self):
         self._respond(200, {"status": "ok"})
 
     def _respond(self, code: int, data: dict) -> None:
+        body = json.dumps(data).encode()
         self.send_response(code)
         self.send_header("Content-Type", "application/json")
+        # Lets a client of a long-running server (local dev) finish reading
+        # before an inline job starts. Vercel's runtime buffers the response
+        # until the handler returns, so there an inline job keeps the
+        # plugin's request open for the whole run.
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
+        self.wfile.flush()
@@ -0,0 +1,79 @@
+"""
+Worker que executa um job enfileirado por /api/webhook/receive.
+
+POST /api/webhook/run
+Headers: Authorization: Bearer <api_secret_key>   (o mesmo usado no receive)
+Body JSON: {"job_id": "...", "wp_url": ..., "wp_username": ..., "wp_app_password": ..., "post_status": ...,
+            "profile": false}
+
+Roda em uma invocação própria, com os 60s inteiros para o scraping. Com
+"profile": true o resultado do job ganha uma chave "profile" com as funções
+mais amostradas na execução; "profile": "memory" inclui também os maiores
+pontos de alocação, mas deixa a execução bem mais lenta (lib/profiling).
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import json
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler
+
+from api.scrape.index import run_all
+from lib.auth import bearer_token, secret_hash
+from lib.jobs import get_job_store, public_view
+from lib.profiling import profiler_for
+
+REQUIRED_FIELDS = {"job_id", "wp_url", "wp_username", "wp_app_password"}
+
+
+def run_job(job_id: str, credentials: dict, auth_token: str = "", profile: bool | str = False) -> None:
+    store = get_job_store()
+    if not store.claim(job_id):
+        return
+    try:
+        profiler = profiler_for(profile)
+        with profiler or nullcontext():
+            result = run_all(credentials=credentials, auth_token=auth_token, profile=profile if profiler else False)
+        if profiler is not None:
+            result["profile"] = profiler.report()
+        store.finish(job_id, result)
+    except Exception as exc:
+        print(f"[job {job_id}] Failed: {exc}")
+        store.fail(job_id, str(exc))
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length)) if length else {}
+        except json.JSONDecodeError:
+            self._respond(400, {"error": "Invalid JSON body"})
+            return
+
+        missing = REQUIRED_FIELDS - body.keys()
+        if missing:
+            self._respond(400, {"error": f"Missing fields: {list(missing)}"})
+            return
+
+        store = get_job_store()
+        token = bearer_token(dict(self.headers))
+        job = store.get(body["job_id"])
+        if job is None or job.get("secret_hash") != secret_hash(token):
+            self._respond(404, {"error": "Unknown job"})
+            return
+
+        credentials = {
+            "wp_url": body["wp_url"],
+            "wp_username": body["wp_username"],
+            "wp_app_password": body["wp_app_password"],
+            "post_status": body.get("post_status", "publish"),
+        }
+        run_job(job["id"], credentials, token, profile=body.get("profile") or False)
+        self._respond(200, public_view(store.get(job["id"]) or job))
+
+    def _respond(self, code: int, data: dict) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode())
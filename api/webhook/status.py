@@ -0,0 +1,42 @@
+"""
+Consulta o andamento de um job de scraping.
+
+GET /api/webhook/status?id=<job_id>
+Headers: Authorization: Bearer <api_secret_key>   (o mesmo usado no receive)
+
+Resposta: {"id", "status": queued|running|done|failed, "result", "error", "created_at", "updated_at"}
+Com status "done", "result" traz o resumo por site de run_all. Um job parado em
+queued/running por mais de JOB_STALE_SECONDS é marcado como falho aqui.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import json
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from lib.auth import bearer_token, secret_hash
+from lib.jobs import expire_if_stale, get_job_store, public_view
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        job_id = parse_qs(urlparse(self.path).query).get("id", [None])[0]
+        if not job_id:
+            self._respond(400, {"error": "Missing id"})
+            return
+
+        store = get_job_store()
+        job = store.get(job_id)
+        # Unknown and not-yours look the same to the caller.
+        if job is None or job.get("secret_hash") != secret_hash(bearer_token(dict(self.headers))):
+            self._respond(404, {"error": "Unknown job"})
+            return
+
+        self._respond(200, public_view(expire_if_stale(store, job)))
+
+    def _respond(self, code: int, data: dict) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode())
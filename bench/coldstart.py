@@ -0,0 +1,108 @@
+"""
+Benchmark de cold start: tempo de import de cada handler em api/ num
+interpretador novo, como numa instância recém-criada da Vercel, e quais
+dependências pesadas ele carrega só por ser importado.
+
+    python bench/coldstart.py [--repeat 7]
+    python bench/coldstart.py --baseline HEAD~1   # compara com outra revisão
+
+Com --baseline a outra revisão é medida num git worktree temporário, lado a
+lado com a árvore atual. O tempo é a mediana das rodadas e não inclui a
+partida do próprio interpretador.
+"""
+import sys, os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+
+HEAVY = ("supabase", "httpx", "bs4", "lxml", "selectolax", "requests")
+
+_PROBE = """
+import importlib, json, sys, time
+sys.path.insert(0, {root!r})
+before = set(sys.modules)
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({{
+    "ms": elapsed * 1e3,
+    "modules": len(loaded),
+    "heavy": [name for name in {heavy!r} if name in loaded],
+}}))
+"""
+
+
+def handlers(root: str) -> list[str]:
+    modules = []
+    for directory, _, files in os.walk(os.path.join(root, "api")):
+        for name in sorted(files):
+            if name.endswith(".py") and name != "__init__.py":
+                path = os.path.relpath(os.path.join(directory, name), root)
+                modules.append(path[:-3].replace(os.sep, "."))
+    return sorted(modules)
+
+
+def measure(root: str, module: str, repeat: int) -> dict | None:
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(root=root, module=module, heavy=HEAVY)],
+            cwd=root, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return None
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {**runs[-1], "ms": statistics.median(run["ms"] for run in runs)}
+
+
+def measure_tree(root: str, modules: list[str], repeat: int) -> dict[str, dict | None]:
+    # Handlers added since `root`'s revision have nothing to compare against.
+    present = set(handlers(root))
+    return {module: measure(root, module, repeat) if module in present else None for module in modules}
+
+
+def measure_revision(revision: str, modules: list[str], repeat: int) -> dict[str, dict | None]:
+    with tempfile.TemporaryDirectory() as directory:
+        tree = os.path.join(directory, "tree")
+        subprocess.run(["git", "worktree", "add", "--detach", "-q", tree, revision], cwd=ROOT, check=True)
+        try:
+            return measure_tree(tree, modules, repeat)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", tree], cwd=ROOT, check=True)
+
+
+def _cell(result: dict | None) -> str:
+    return f"{result['ms']:8.0f} ms {result['modules']:5d} mód." if result else f"{'—':>20}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--baseline", help="revisão git para comparar (ex.: HEAD~1)")
+    args = parser.parse_args()
+
+    modules = handlers(ROOT)
+    current = measure_tree(ROOT, modules, args.repeat)
+    baseline = measure_revision(args.baseline, modules, args.repeat) if args.baseline else None
+
+    header = f"{'handler':<28} {'atual':>20}"
+    if baseline is not None:
+        header += f" {args.baseline:>20} {'ganho':>8}"
+    print(header + "   dependências pesadas (atual)")
+    for module in modules:
+        now = current[module]
+        line = f"{module:<28} {_cell(now)}"
+        if baseline is not None:
+            before = baseline[module]
+            line += f" {_cell(before)}"
+            line += f" {before['ms'] - now['ms']:5.0f} ms" if before and now else f" {'':>8}"
+        print(f"{line}   {', '.join(now['heavy']) if now else 'falhou'}")
+
+
+if __name__ == "__main__":
+    main()
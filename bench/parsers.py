@@ -0,0 +1,199 @@
+"""
+Benchmark dos backends de parsing HTML (bs4, lxml, selectolax) sobre páginas
+salvas: tempo da listagem (parse + get_article_links), tempo de parse e de
+extração por artigo e memória residente por documento, além de conferir se
+cada backend extrai exatamente os mesmos links e artigos que o bs4. A linha
+"partial" é a listagem lida em streaming só com as tags de listing_tags.
+
+    python bench/parsers.py --save pages/      # baixa listagem + artigos de cada site
+    python bench/parsers.py pages/ [--repeat 5]
+
+Cada backend roda num subprocesso próprio para que a memória de um não
+contamine a medida do outro.
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gc
+import hashlib
+import json
+import subprocess
+import time
+
+# "partial" mede só as listagens, com o parse incremental de listing_tags.
+BACKENDS = ("bs4", "lxml", "selectolax", "partial")
+
+
+def _scrapers() -> dict:
+    from lib.registry import SITE_KEYS, load_scraper
+    return {key: load_scraper(key) for key in SITE_KEYS}
+
+
+def save_pages(directory: str, articles: int) -> None:
+    from lib.scraper_base import HEADERS
+    from lib.http_session import get_session
+    from lib.parsing import parse_html
+
+    def download(url: str) -> str | None:
+        try:
+            resp = get_session().get(url, headers=HEADERS, timeout=15)
+            resp.raise_for_status()
+        except Exception as exc:
+            print(f"  {url}: {exc}")
+            return None
+        resp.encoding = resp.apparent_encoding or "utf-8"
+        return resp.text
+
+    for key, scraper_cls in _scrapers().items():
+        scraper = scraper_cls()
+        listing = download(scraper.listing_url)
+        if listing is None:
+            continue
+        site_dir = os.path.join(directory, key)
+        os.makedirs(site_dir, exist_ok=True)
+        with open(os.path.join(site_dir, "listing.html"), "w", encoding="utf-8") as fh:
+            fh.write(listing)
+        urls = {}
+        for n, link in enumerate(scraper.get_article_links(parse_html(listing, "bs4"))[:articles]):
+            page = download(link)
+            if page is None:
+                continue
+            name = f"{n:02d}.html"
+            with open(os.path.join(site_dir, name), "w", encoding="utf-8") as fh:
+                fh.write(page)
+            urls[name] = link
+        with open(os.path.join(site_dir, "urls.json"), "w", encoding="utf-8") as fh:
+            json.dump(urls, fh, indent=1)
+        print(f"{key}: listagem + {len(urls)} artigos")
+
+
+def load_pages(directory: str) -> list[tuple[type, str, list[tuple[str, str]]]]:
+    scrapers = _scrapers()
+    sites = []
+    for key in sorted(os.listdir(directory)):
+        site_dir = os.path.join(directory, key)
+        if key not in scrapers or not os.path.isdir(site_dir):
+            continue
+        with open(os.path.join(site_dir, "listing.html"), encoding="utf-8") as fh:
+            listing = fh.read()
+        with open(os.path.join(site_dir, "urls.json"), encoding="utf-8") as fh:
+            urls = json.load(fh)
+        articles = []
+        for name, url in sorted(urls.items()):
+            with open(os.path.join(site_dir, name), encoding="utf-8") as fh:
+                articles.append((url, fh.read()))
+        sites.append((scrapers[key], listing, articles))
+    return sites
+
+
+def _rss() -> int:
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(backend: str, directory: str, repeat: int) -> dict:
+    from lib.parsing import get_parser, parse_partial
+
+    sites = load_pages(directory)
+    pages = [html for _, _, articles in sites for _, html in articles]
+    if backend == "partial":
+        # Listings only: stream parse of the tags each scraper declares.
+        parse = None
+    else:
+        parse = get_parser(backend)
+        if backend != "bs4" and parse is get_parser("bs4"):
+            raise SystemExit(f"backend {backend} não está instalado")
+
+    # Resident memory of every article document kept alive at once, measured
+    # first so freed memory from the timing rounds cannot be reused.
+    per_doc = None
+    if parse is not None:
+        gc.collect()
+        before = _rss()
+        docs = [parse(html) for html in pages]
+        per_doc = (_rss() - before) / max(1, len(docs))
+        del docs
+
+    listing_time = parse_time = extract_time = float("inf")
+    listing_fp, article_fp = hashlib.sha256(), hashlib.sha256()
+    for round_ in range(repeat):
+        listing_total = parse_total = extract_total = 0.0
+        for scraper_cls, listing, articles in sites:
+            scraper = scraper_cls()
+            start = time.perf_counter()
+            if parse is None:
+                doc = parse_partial(listing, scraper.listing_tags) if scraper.listing_tags else get_parser("bs4")(listing)
+            else:
+                doc = parse(listing)
+            links = scraper.get_article_links(doc)
+            listing_total += time.perf_counter() - start
+            if round_ == 0:
+                listing_fp.update(repr(links).encode())
+            if parse is None:
+                continue
+            for url, html in articles:
+                start = time.perf_counter()
+                doc = parse(html)
+                parse_total += time.perf_counter() - start
+                start = time.perf_counter()
+                article = scraper.parse_article(doc, url)
+                extract_total += time.perf_counter() - start
+                if round_ == 0:
+                    article_fp.update(repr(article).encode())
+        listing_time = min(listing_time, listing_total)
+        parse_time = min(parse_time, parse_total)
+        extract_time = min(extract_time, extract_total)
+
+    return {
+        "sites": len(sites),
+        "articles": len(pages) if parse is not None else 0,
+        "listing_ms": listing_time * 1e3 / max(1, len(sites)),
+        "parse_ms": parse_time * 1e3 / max(1, len(pages)),
+        "extract_ms": extract_time * 1e3 / max(1, len(pages)),
+        "rss_kib": per_doc / 1024 if per_doc is not None else None,
+        "listing_fp": listing_fp.hexdigest(),
+        "article_fp": article_fp.hexdigest() if parse is not None else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("--save", action="store_true", help="baixa as páginas para o diretório")
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.directory, args.articles)
+        return
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.directory, args.repeat)))
+        return
+
+    results = {}
+    for backend in BACKENDS:
+        proc = subprocess.run(
+            [sys.executable, __file__, args.directory, "--measure", backend, "--repeat", str(args.repeat)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{backend:>10}: falhou\n{proc.stderr.strip()}")
+            continue
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    reference = results.get("bs4", {})
+    for backend, r in results.items():
+        same = r["listing_fp"] == reference.get("listing_fp") and r["article_fp"] in (None, reference.get("article_fp"))
+        line = f"{backend:>10}: listagem {r['listing_ms']:6.2f} ms/site"
+        if r["articles"]:
+            line += (
+                f"  artigo: parse {r['parse_ms']:5.2f} ms  extração {r['extract_ms']:5.2f} ms"
+                f"  RSS {r['rss_kib']:5.0f} KiB/documento"
+            )
+        print(f"{line}  ({'igual ao bs4' if same else 'DIFERE do bs4'})")
+
+if __name__ == "__main__":
+    main()
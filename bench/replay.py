@@ -0,0 +1,211 @@
+"""
+Benchmark offline dos scrapers: grava as respostas HTTP dos sites num corpus
+comprimido e depois roda todos os scrapers de ponta a ponta contra esse corpus,
+sem rede, com Supabase e WordPress substituídos por stubs.
+
+    python bench/replay.py record [--corpus bench/corpus.jsonl.gz]   # precisa de rede
+    python bench/replay.py run [--corpus ...] [--repeat 3] [--allocations]
+
+Pré-requisito: o corpus não vem no repositório (são páginas dos portais, com
+direitos autorais e dados de terceiros). Antes do primeiro `run`, grave um com
+`record` numa máquina com acesso aos sites; ele fica em bench/corpus.jsonl.gz
+e não deve ser commitado. Para comparar revisões, use o mesmo arquivo nas duas:
+os sites mudam a cada gravação, e corpora diferentes dão números diferentes.
+Sites que falharam na gravação aparecem no `run` como "fora do corpus".
+
+Relata, por etapa (fetch, parse, dedup, filter, classify, publish), o tempo
+exclusivo somado e por chamada, artigos/s de cada rodada e, com --allocations
+(que força execução serial), o pico de memória alocada em cada etapa, incluindo
+as etapas aninhadas (o fetch contém o parse da página). O pico vem do
+tracemalloc e só enxerga alocações do Python, não as do lexbor/libxml2.
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import functools
+import itertools
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import lib.local_state as local_state
+import lib.scraper_base as scraper_base
+import lib.story_dedup as story_dedup
+from lib.filter import DEFAULT_BLACKLIST
+from lib.replay import RecordingAdapter, ReplayAdapter, install
+from lib.scheduler import Deadline, SiteSchedule
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.jsonl.gz")
+CREDENTIALS = {"wp_url": "https://wordpress.invalid", "wp_username": "bench", "wp_app_password": "bench"}
+STAGES = ("fetch", "parse", "dedup", "filter", "classify", "publish")
+
+
+def stub_backends() -> None:
+    """Supabase and WordPress answer locally: nothing published, nothing checkpointed."""
+    post_ids = itertools.count(1)
+    scraper_base.get_published_urls = lambda urls: set()
+    scraper_base.log_published_url = lambda **kwargs: None
+    scraper_base.log_scrape_result = lambda **kwargs: None
+    scraper_base.load_checkpoint = lambda site: None
+    scraper_base.save_checkpoint = lambda checkpoint: None
+    scraper_base.clear_checkpoint = lambda checkpoint: None
+    scraper_base.upload_image = lambda image_url, filename, credentials: 1
+    scraper_base.create_post = lambda **kwargs: next(post_ids)
+    story_dedup.get_story_bands = lambda keys: []
+    story_dedup.claim_story_bands = lambda rows: {
+        row["band_key"]: {**row, "created_at": None} for row in rows
+    }
+    story_dedup.release_story_bands = lambda url: None
+
+
+def reset_state(directory: str, round_: int) -> None:
+    # Fresh listing validators, link snapshots and story index, or every
+    # round after the first would find nothing new to do.
+    local_state._state = local_state.LocalState(os.path.join(directory, f"state-{round_}.json"))
+    story_dedup._index = story_dedup.StoryIndex()
+
+
+class StageTimer:
+    """Exclusive time (and optionally allocation peak) of each pipeline stage."""
+
+    def __init__(self, allocations: bool):
+        self.allocations = allocations
+        self.stats = {stage: {"calls": 0, "seconds": 0.0, "peak": 0} for stage in STAGES}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def wrap(self, stage: str, func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            stack = self._local.__dict__.setdefault("stack", [])
+            frame = {"children": 0.0, "peak": 0}
+            if self.allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+                frame["base"] = current
+                tracemalloc.reset_peak()
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                peak = 0
+                if self.allocations:
+                    peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                    if stack:
+                        stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+                    peak -= frame["base"]
+                if stack:
+                    stack[-1]["children"] += elapsed
+                with self._lock:
+                    entry = self.stats[stage]
+                    entry["calls"] += 1
+                    entry["seconds"] += elapsed - frame["children"]
+                    entry["peak"] = max(entry["peak"], peak)
+
+        return timed
+
+
+def instrument(timer: StageTimer, scrapers: list[type]) -> None:
+    base = scraper_base.BaseScraper
+    base.fetch = timer.wrap("fetch", base.fetch)
+    base.fetch_listing = timer.wrap("fetch", base.fetch_listing)
+    scraper_base.parse_html = timer.wrap("parse", scraper_base.parse_html)
+    scraper_base.parse_listing = timer.wrap("parse", scraper_base.parse_listing)
+    scraper_base.parse_feed = timer.wrap("parse", scraper_base.parse_feed)
+    scraper_base.find_duplicate = timer.wrap("dedup", scraper_base.find_duplicate)
+    scraper_base.claim_story = timer.wrap("dedup", scraper_base.claim_story)
+    scraper_base.is_violent_content = timer.wrap("filter", scraper_base.is_violent_content)
+    scraper_base.classify_article = timer.wrap("classify", scraper_base.classify_article)
+    base._publish_article = timer.wrap("publish", base._publish_article)
+    for cls in {base, *scrapers}:
+        for name in ("get_article_links", "parse_article", "article_from_feed"):
+            if name in vars(cls):
+                setattr(cls, name, timer.wrap("parse", vars(cls)[name]))
+
+
+def run_round(scrapers: list[type], serial: bool) -> tuple[float, list]:
+    results = []
+    start = time.perf_counter()
+    for cls in scrapers:
+        scraper = cls()
+        if serial:
+            scraper.max_concurrency = 1
+        schedule = SiteSchedule(deadline=Deadline(3600))
+        results.append(scraper.run(CREDENTIALS, blacklist=DEFAULT_BLACKLIST, schedule=schedule))
+    return time.perf_counter() - start, results
+
+
+def record(corpus: str, scrapers: list[type]) -> None:
+    stub_backends()
+    adapter = install(RecordingAdapter())
+    with tempfile.TemporaryDirectory() as directory:
+        reset_state(directory, 0)
+        _, results = run_round(scrapers, serial=False)
+    for result in results:
+        print(f"{result.source_site:>24}: {result.articles_found} links, erro: {result.error}")
+    print(f"{adapter.save(corpus)} respostas gravadas em {corpus}")
+
+
+def replay(corpus: str, scrapers: list[type], repeat: int, allocations: bool) -> None:
+    stub_backends()
+    adapter = install(ReplayAdapter(corpus))
+    for cls in scrapers:
+        cls.request_delay = 0
+    timer = StageTimer(allocations)
+    instrument(timer, scrapers)
+    if allocations:
+        tracemalloc.start()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for round_ in range(repeat):
+            reset_state(directory, round_)
+            wall, results = run_round(scrapers, serial=allocations)
+            articles = sum(r.articles_published + r.articles_filtered for r in results)
+            print(f"rodada {round_ + 1}: {articles} artigos em {wall:.2f}s ({articles / wall:.1f} artigos/s)")
+            if round_ == 0:
+                for r in results:
+                    print(
+                        f"  {r.source_site:>24}: {r.articles_found} links, {r.articles_published} publicados,"
+                        f" {r.articles_filtered} filtrados, {len(r.duplicates)} repetidos, {r.duration:.2f}s"
+                        + (f", erro: {r.error}" if r.error else "")
+                    )
+
+    print("\netapa       chamadas   total (s)   por chamada (ms)" + ("   pico alocado (KiB)" if allocations else ""))
+    for stage, entry in timer.stats.items():
+        per_call = entry["seconds"] * 1e3 / entry["calls"] if entry["calls"] else 0.0
+        line = f"{stage:<10} {entry['calls']:>9} {entry['seconds']:>11.3f} {per_call:>18.2f}"
+        if allocations:
+            line += f" {entry['peak'] / 1024:>20.0f}"
+        print(line)
+    if adapter.misses:
+        print(f"\n{len(adapter.misses)} requisições fora do corpus (ex.: {adapter.misses[0]})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=("record", "run"))
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--site", action="append", help="só estes sites (nome do módulo em api/scrape)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--allocations", action="store_true")
+    args = parser.parse_args()
+
+    from lib.registry import SITE_KEYS, load_scrapers
+    scrapers = load_scrapers([key for key in SITE_KEYS if not args.site or key in args.site])
+
+    if args.mode == "record":
+        record(args.corpus, scrapers)
+    elif not os.path.exists(args.corpus):
+        sys.exit(f"{args.corpus} não existe: grave o corpus antes com `python bench/replay.py record`.")
+    else:
+        replay(args.corpus, scrapers, args.repeat, args.allocations)
+
+
+if __name__ == "__main__":
+    main()
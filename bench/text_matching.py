@@ -0,0 +1,86 @@
+"""
+Benchmark do filtro + classificador: varredura antiga (.lower() + um `in` por
+palavra-chave) contra a normalização compartilhada com casamento por palavra.
+
+    python bench/text_matching.py [--articles 2000] [--paragraphs 12]
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+
+from lib.classifier import CATEGORY_KEYWORDS, FALLBACK_CATEGORY, PRIORITY_ORDER, classify_article
+from lib.filter import DEFAULT_BLACKLIST, is_violent_content
+
+SENTENCES = [
+    "A Prefeitura de Maceió anunciou nesta segunda-feira um pacote de obras na orla da Pajuçara.",
+    "Segundo a secretaria, o investimento chega a R$ 12 milhões e deve gerar cerca de 400 empregos.",
+    "O governador participou da solenidade ao lado de deputados e vereadores da capital alagoana.",
+    "Moradores do Jacintinho reclamam da falta de iluminação pública nas ruas do bairro.",
+    "O festival de inverno de Penedo terá shows gratuitos, teatro e exposição de artesanato.",
+    "Com gol nos acréscimos, o CRB venceu o CSA e assumiu a liderança do campeonato.",
+    "A Câmara aprovou em primeira votação o projeto que reorganiza o transporte coletivo.",
+    "A feira de Arapiraca reúne produtores do agreste alagoano todos os sábados.",
+    "Segundo a Defesa Civil, a previsão é de chuvas moderadas durante toda a semana.",
+    "A farmácia popular do Centro passa a funcionar também aos domingos pela manhã.",
+    "Estudantes da rede estadual participam da olimpíada de matemática em Rio Largo.",
+    "O carnaval fora de época deve movimentar a economia de Marechal Deodoro.",
+]
+
+
+def old_is_violent_content(title: str, body: str, blacklist: list[str]) -> bool:
+    combined = (title + " " + body).lower()
+    return any(keyword.lower() in combined for keyword in blacklist)
+
+
+def old_classify_article(title: str, first_paragraph: str) -> str:
+    combined = (title + " " + first_paragraph).lower()
+    for category in PRIORITY_ORDER:
+        if any(kw.lower() in combined for kw in CATEGORY_KEYWORDS[category]):
+            return category
+    return FALLBACK_CATEGORY
+
+
+def make_articles(count: int, paragraphs: int, seed: int = 7) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    articles = []
+    for n in range(count):
+        title = f"{rng.choice(SENTENCES)[:60]} ({n})"
+        body = "\n".join(
+            " ".join(rng.sample(SENTENCES, 4)) + f" Nota {n}-{p}." for p in range(paragraphs)
+        )
+        articles.append((title, body))
+    return articles
+
+
+def run(articles, is_violent, classify) -> float:
+    start = time.perf_counter()
+    for title, body in articles:
+        if not is_violent(title, body, DEFAULT_BLACKLIST):
+            classify(title, body.split("\n")[0])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--paragraphs", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles, args.paragraphs)
+    avg_len = sum(len(t) + len(b) for t, b in articles) / len(articles)
+    print(f"{len(articles)} artigos, {avg_len:.0f} caracteres em média")
+
+    for label, is_violent, classify in (
+        ("lower() + scans", old_is_violent_content, old_classify_article),
+        ("normalized", is_violent_content, classify_article),
+    ):
+        best = min(run(articles, is_violent, classify) for _ in range(args.repeat))
+        print(f"{label:>16}: {best * 1e6 / len(articles):8.1f} µs/artigo")
+
+
+if __name__ == "__main__":
+    main()
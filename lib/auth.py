@@ -0,0 +1,22 @@
+import hashlib
+import hmac
+
+
+def bearer_token(headers: dict) -> str:
+    auth = headers.get("authorization") or headers.get("Authorization", "")
+    return auth[len("Bearer "):] if auth.startswith("Bearer ") else ""
+
+
+def authenticate(headers: dict, api_secret: str | None) -> bool:
+    """
+    Valida o Bearer token enviado pelo plugin WP.
+    Se o plugin não configurou api_secret, aceita qualquer requisição.
+    """
+    if not api_secret:
+        return True
+    return hmac.compare_digest(bearer_token(headers), api_secret)
+
+
+def secret_hash(secret: str | None) -> str:
+    """Stored with a job so that only the same caller can poll or run it."""
+    return hashlib.sha256((secret or "").encode()).hexdigest()
@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from lib.supabase_client import delete_checkpoint_row, get_checkpoint_row, upsert_checkpoint_row
+
+# How long an interrupted run may be resumed before its listing counts as stale.
+CHECKPOINT_TTL = float(os.environ.get("CHECKPOINT_TTL_SECONDS", "1800"))
+
+FETCHED = "fetched"
+FILTERED = "filtered"
+PUBLISHED = "published"
+FAILED = "failed"
+TERMINAL_STATES = {FILTERED, PUBLISHED, FAILED}
+
+
+@dataclass
+class Checkpoint:
+    """Listing snapshot of one site and how far each of its links got."""
+
+    site: str
+    links: list[str]
+    states: dict[str, str] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    persisted: bool = False
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def mark(self, link: str, state: str) -> None:
+        with self._lock:
+            self.states[link] = state
+
+    def pending(self) -> list[str]:
+        with self._lock:
+            return [link for link in self.links if self.states.get(link) not in TERMINAL_STATES]
+
+    def expired(self, ttl: float = CHECKPOINT_TTL) -> bool:
+        return time.time() - self.started_at > ttl
+
+
+def load_checkpoint(site: str, ttl: float = CHECKPOINT_TTL) -> Checkpoint | None:
+    """The site's unexpired checkpoint, if a previous run left links pending."""
+    row = get_checkpoint_row(site)
+    if row is None:
+        return None
+    checkpoint = Checkpoint(
+        site=site,
+        links=row["links"],
+        states=row["states"],
+        started_at=row["started_at"],
+        persisted=True,
+    )
+    if checkpoint.expired(ttl) or not checkpoint.pending():
+        delete_checkpoint_row(site)
+        return None
+    return checkpoint
+
+
+def save_checkpoint(checkpoint: Checkpoint) -> None:
+    with checkpoint._lock:
+        states = dict(checkpoint.states)
+    upsert_checkpoint_row(checkpoint.site, checkpoint.links, states, checkpoint.started_at)
+    checkpoint.persisted = True
+
+
+def clear_checkpoint(checkpoint: Checkpoint) -> None:
+    if checkpoint.persisted:
+        delete_checkpoint_row(checkpoint.site)
+        checkpoint.persisted = False
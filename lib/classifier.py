@@ -1,3 +1,6 @@
+from lib.matcher import KeywordMatcher
+from lib.metrics import timed
+
 CATEGORY_KEYWORDS: dict[str, list[str]] = {
     "Maceió": [
         "maceió", "pajuçara", "ponta verde", "jatiúca", "cruz das almas",
@@ -28,10 +31,19 @@ PRIORITY_ORDER = ["Maceió", "Arapiraca", "Interior", "Política", "Esporte", "C
 FALLBACK_CATEGORY = "Cidades"
 
 
+# One matcher over every category's keywords; a keyword listed under several
+# categories belongs to the highest-priority one.
+_KEYWORD_CATEGORY: dict[str, str] = {}
+for _category in reversed(PRIORITY_ORDER):
+    for _kw in CATEGORY_KEYWORDS[_category]:
+        _KEYWORD_CATEGORY[_kw.lower()] = _category
+_MATCHER = KeywordMatcher(_KEYWORD_CATEGORY)
+
+
+@timed("classify")
 def classify_article(title: str, first_paragraph: str) -> str:
-    combined = (title + " " + first_paragraph).lower()
+    hits = {_KEYWORD_CATEGORY[kw] for kw in _MATCHER.matches(title, first_paragraph)}
     for category in PRIORITY_ORDER:
-        keywords = CATEGORY_KEYWORDS[category]
-        if any(kw.lower() in combined for kw in keywords):
+        if category in hits:
             return category
     return FALLBACK_CATEGORY
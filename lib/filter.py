@@ -1,3 +1,6 @@
+from lib.matcher import get_matcher
+from lib.metrics import timed
+
 DEFAULT_BLACKLIST = [
     "homicídio", "assassinato", "assalto", "roubo", "furto", "preso", "prisão",
     "delegacia", "polícia", "policial", "crime", "criminoso", "tráfico", "drogas",
@@ -9,8 +12,8 @@ DEFAULT_BLACKLIST = [
 ]
 
 
+@timed("filter")
 def is_violent_content(title: str, body: str, blacklist: list[str] | None = None) -> bool:
     if blacklist is None:
         blacklist = DEFAULT_BLACKLIST
-    combined = (title + " " + body).lower()
-    return any(keyword.lower() in combined for keyword in blacklist)
+    return get_matcher(blacklist).search(title, body) is not None
@@ -0,0 +1,85 @@
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import make_headers
+
+# Host pools kept alive at once (7 news sites, their image CDNs, WordPress, ...)
+POOL_CONNECTIONS = 32
+# Keep-alive connections per host; must cover BaseScraper.max_concurrency.
+POOL_MAXSIZE = 10
+
+_stats: dict[str, dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _count(host: str, key: str) -> None:
+    with _stats_lock:
+        entry = _stats.setdefault(host, {"requests": 0, "opened": 0})
+        entry[key] += 1
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count(self.host, "opened")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count(self.host, "opened")
+        return super()._new_conn()
+
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        _count(urlparse(request.url).hostname or "", "requests")
+        return super().send(request, **kwargs)
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide session shared by page fetches, image transfers and WordPress calls."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _PooledAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                # Advertises br (and zstd) only when urllib3 can decode them.
+                session.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+                _session = session
+    return _session
+
+
+def connection_stats(since: dict[str, dict[str, int]] | None = None) -> dict[str, dict[str, int]]:
+    """
+    Per-host counts of requests sent, connections opened and connections
+    reused. The counters live as long as the process, so a run passes the
+    snapshot it took when it started as `since` to get only its own traffic
+    (plus that of any run overlapping it in the same instance).
+    """
+    since = since or {}
+    stats = {}
+    with _stats_lock:
+        for host, entry in _stats.items():
+            before = since.get(host, {})
+            requests = entry["requests"] - before.get("requests", 0)
+            opened = entry["opened"] - before.get("opened", 0)
+            if requests or opened:
+                stats[host] = {"requests": requests, "opened": opened, "reused": max(0, requests - opened)}
+    return stats
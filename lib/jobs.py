@@ -0,0 +1,181 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timezone
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# A run is cut off at the function's maxDuration (60s) without getting to
+# mark its job; a job queued or running for longer than this since its last
+# update is reported as failed.
+JOB_STALE_SECONDS = float(os.environ.get("JOB_STALE_SECONDS", "120"))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SupabaseJobStore:
+    """Jobs kept in the scrape_jobs table, visible to every invocation."""
+
+    table = "scrape_jobs"
+
+    def _client(self):
+        from lib.supabase_client import get_client
+        return get_client()
+
+    def create(self, secret_hash: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = _now()
+        self._client().table(self.table).insert({
+            "id": job_id,
+            "status": QUEUED,
+            "secret_hash": secret_hash,
+            "created_at": now,
+            "updated_at": now,
+        }).execute()
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        result = self._client().table(self.table).select("*").eq("id", job_id).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    def claim(self, job_id: str) -> bool:
+        """Move a queued job to running; False if another worker got it first."""
+        result = (
+            self._client().table(self.table)
+            .update({"status": RUNNING, "updated_at": _now()})
+            .eq("id", job_id)
+            .eq("status", QUEUED)
+            .execute()
+        )
+        return bool(result.data)
+
+    def finish(self, job_id: str, result: dict) -> None:
+        self._client().table(self.table).update(
+            {"status": DONE, "result": result, "updated_at": _now()}
+        ).eq("id", job_id).execute()
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._client().table(self.table).update(
+            {"status": FAILED, "error": error, "updated_at": _now()}
+        ).eq("id", job_id).execute()
+
+    def expire(self, job_id: str, status: str, error: str) -> bool:
+        """Fail the job only if it is still in `status`; False if it moved on meanwhile."""
+        result = (
+            self._client().table(self.table)
+            .update({"status": FAILED, "error": error, "updated_at": _now()})
+            .eq("id", job_id)
+            .eq("status", status)
+            .execute()
+        )
+        return bool(result.data)
+
+
+class SQLiteJobStore:
+    """Local stand-in for scrape_jobs, for development and tests."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scrape_jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, secret_hash TEXT,"
+                " result TEXT, error TEXT, created_at TEXT, updated_at TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def create(self, secret_hash: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = _now()
+        self._execute(
+            "INSERT INTO scrape_jobs (id, status, secret_hash, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, QUEUED, secret_hash, now, now),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT * FROM scrape_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def claim(self, job_id: str) -> bool:
+        return self._execute(
+            "UPDATE scrape_jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, _now(), job_id, QUEUED),
+        ) == 1
+
+    def finish(self, job_id: str, result: dict) -> None:
+        self._execute(
+            "UPDATE scrape_jobs SET status = ?, result = ?, updated_at = ? WHERE id = ?",
+            (DONE, json.dumps(result), _now(), job_id),
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._execute(
+            "UPDATE scrape_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (FAILED, error, _now(), job_id),
+        )
+
+    def expire(self, job_id: str, status: str, error: str) -> bool:
+        return self._execute(
+            "UPDATE scrape_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (FAILED, error, _now(), job_id, status),
+        ) == 1
+
+
+_store: SupabaseJobStore | SQLiteJobStore | None = None
+
+
+def get_job_store() -> SupabaseJobStore | SQLiteJobStore:
+    """JOB_STORE=sqlite selects the local store (file at JOB_STORE_PATH)."""
+    global _store
+    if _store is None:
+        if os.environ.get("JOB_STORE") == "sqlite":
+            path = os.environ.get("JOB_STORE_PATH") or os.path.join(tempfile.gettempdir(), "confaa_jobs.sqlite3")
+            _store = SQLiteJobStore(path)
+        else:
+            _store = SupabaseJobStore()
+    return _store
+
+
+def expire_if_stale(store: SupabaseJobStore | SQLiteJobStore, job: dict) -> dict:
+    """
+    `job`, or the job as failed when it has been queued or running for more
+    than JOB_STALE_SECONDS: its invocation was killed or never started, and
+    nothing else would ever move it on.
+    """
+    if job["status"] not in (QUEUED, RUNNING) or not job.get("updated_at"):
+        return job
+    idle = (datetime.now(timezone.utc) - datetime.fromisoformat(job["updated_at"])).total_seconds()
+    if idle <= JOB_STALE_SECONDS:
+        return job
+    error = f"Job still {job['status']} after {idle:.0f}s; its run was cut off or never started"
+    if store.expire(job["id"], job["status"], error):
+        print(f"[jobs] {job['id']}: {error}")
+    return store.get(job["id"]) or job
+
+
+def public_view(job: dict) -> dict:
+    """The job fields the plugin may see."""
+    return {key: job.get(key) for key in ("id", "status", "result", "error", "created_at", "updated_at")}
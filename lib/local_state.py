@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import threading
+
+STATE_PATH = os.environ.get("LOCAL_STATE_PATH") or os.path.join(tempfile.gettempdir(), "confaa_state.json")
+
+
+class LocalState:
+    """
+    Small JSON key-value store on local disk (the instance's /tmp on Vercel).
+
+    Only for state whose loss costs a slower run, never a wrong one: a cold
+    instance simply starts empty.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as fh:
+                self._data: dict[str, dict] = json.load(fh)
+        except (OSError, ValueError):
+            self._data = {}
+
+    def get(self, namespace: str, key: str):
+        with self._lock:
+            return self._data.get(namespace, {}).get(key)
+
+    def set(self, namespace: str, key: str, value) -> None:
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = value
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as fh:
+                    json.dump(self._data, fh)
+                os.replace(tmp_path, self.path)
+            except OSError as exc:
+                print(f"[local_state] Could not write {self.path}: {exc}")
+
+
+_state: LocalState | None = None
+_state_lock = threading.Lock()
+
+
+def get_local_state() -> LocalState:
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                _state = LocalState(STATE_PATH)
+    return _state
@@ -0,0 +1,115 @@
+import re
+import threading
+from typing import Iterable, Iterator
+
+from lib.textnorm import normalize, normalize_keyword
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        group = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        # Greedy optional tail: the longest keyword sharing this prefix wins.
+        return f"(?:{group})?" if "" in node else group
+
+    return build(trie)
+
+
+def _variants(keyword: str) -> set[str]:
+    # Plain Portuguese plurals, so that "preso" still catches "presos" and
+    # "prisao" catches "prisoes" now that matches must be whole words.
+    variants = {keyword, keyword + "s", keyword + "es"}
+    if keyword.endswith("ao"):
+        variants.update({keyword[:-2] + "oes", keyword[:-2] + "aes"})
+    return variants
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher compiled once per keyword set.
+
+    Texts and keywords are compared in their normalized form (casefolded,
+    without accents) and only whole words or whole phrases match, so "gol"
+    no longer hits "governo" and "maceio" hits "Maceió". Single-word keywords
+    are answered with a set intersection against the text's tokens and
+    phrases with a padded substring check; the trie regex is only used when
+    hit positions are requested.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(kw for kw in keywords if kw))
+        self._words: dict[str, str] = {}
+        self._phrases: dict[str, str] = {}
+        for keyword in self.keywords:
+            normalized = normalize_keyword(keyword)
+            if not normalized:
+                print(f"[matcher] Ignoring keyword {keyword!r}: it does not survive normalization")
+                continue
+            if " " in normalized:
+                self._phrases.setdefault(f" {normalized} ", keyword)
+            else:
+                for variant in _variants(normalized):
+                    self._words.setdefault(variant, keyword)
+        self._by_form = {**self._words, **{p.strip(): kw for p, kw in self._phrases.items()}}
+        self._word_set = frozenset(self._words)
+        pattern = _trie_pattern(self._by_form)
+        # Consumes only the separating space, so overlapping phrases are all
+        # reported.
+        self._all = re.compile(f" (?=({pattern}) )") if self._by_form else None
+
+    def matches(self, *texts: str) -> set[str]:
+        """Return the keywords found in any of `texts`."""
+        found: set[str] = set()
+        for raw in texts:
+            text = normalize(raw)
+            found.update(self._words[token] for token in self._word_set & text.tokens)
+            found.update(kw for phrase, kw in self._phrases.items() if phrase in text.text)
+        return found
+
+    def search(self, *texts: str) -> str | None:
+        """Return a keyword found in any of `texts`, or None."""
+        for raw in texts:
+            text = normalize(raw)
+            hit = self._word_set & text.tokens
+            if hit:
+                return self._words[next(iter(hit))]
+            for phrase, keyword in self._phrases.items():
+                if phrase in text.text:
+                    return keyword
+        return None
+
+    def finditer(self, text: str) -> Iterator[tuple[int, str]]:
+        """Yield (position, keyword) for every hit, positions being in the normalized text."""
+        if self._all is None:
+            return
+        for match in self._all.finditer(normalize(text).text):
+            yield match.start(1) - 1, self._by_form[match.group(1)]
+
+    def find_all(self, text: str) -> list[tuple[int, str]]:
+        return list(self.finditer(text))
+
+
+_cache: dict[frozenset[str], KeywordMatcher] = {}
+_cache_lock = threading.Lock()
+
+
+def get_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """Return the compiled matcher for this keyword set, building it on first use."""
+    key = frozenset(kw for kw in keywords if kw)
+    matcher = _cache.get(key)
+    if matcher is None:
+        with _cache_lock:
+            matcher = _cache.get(key)
+            if matcher is None:
+                matcher = KeywordMatcher(key)
+                _cache[key] = matcher
+    return matcher
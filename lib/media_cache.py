@@ -0,0 +1,54 @@
+import hashlib
+import threading
+
+from lib.supabase_client import delete_cached_media, get_cached_media, store_cached_media
+
+# WordPress media IDs already known in this process, per (wp_url, media key).
+_local: dict[tuple[str, str], int] = {}
+_local_lock = threading.Lock()
+
+
+def source_key(image_url: str, etag: str | None) -> str:
+    return "url:" + hashlib.sha256(f"{image_url} {etag or ''}".encode()).hexdigest()
+
+
+def content_key(sha256_hex: str) -> str:
+    return "sha256:" + sha256_hex
+
+
+def find_media(wp_url: str, keys: list[str]) -> int | None:
+    with _local_lock:
+        for key in keys:
+            if (wp_url, key) in _local:
+                return _local[(wp_url, key)]
+    try:
+        media_id = get_cached_media(wp_url, keys)
+    except Exception as exc:
+        print(f"[media_cache] Lookup failed: {exc}")
+        return None
+    if media_id is not None:
+        with _local_lock:
+            for key in keys:
+                _local[(wp_url, key)] = media_id
+    return media_id
+
+
+def remember_media(wp_url: str, keys: list[str], media_id: int, source_url: str) -> None:
+    with _local_lock:
+        for key in keys:
+            _local[(wp_url, key)] = media_id
+    try:
+        store_cached_media(wp_url, keys, media_id, source_url)
+    except Exception as exc:
+        print(f"[media_cache] Store failed: {exc}")
+
+
+def forget_media(wp_url: str, media_id: int) -> None:
+    """Drop every key pointing at `media_id`, e.g. once it was deleted from the media library."""
+    with _local_lock:
+        for entry in [entry for entry, cached in _local.items() if entry[0] == wp_url and cached == media_id]:
+            del _local[entry]
+    try:
+        delete_cached_media(wp_url, media_id)
+    except Exception as exc:
+        print(f"[media_cache] Delete failed: {exc}")
@@ -0,0 +1,107 @@
+import contextvars
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class RunMetrics:
+    """Timings and byte counts of one site run, by span name."""
+
+    def __init__(self):
+        self._seconds: dict[str, list[float]] = {}
+        self._bytes: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._seconds.setdefault(name, []).append(seconds)
+
+    def add_bytes(self, name: str, count: int) -> None:
+        with self._lock:
+            self._bytes[name] = self._bytes.get(name, 0) + count
+
+    def summary(self) -> dict[str, dict]:
+        """Per span: count, p50/p95/max/total in milliseconds and bytes, when any were counted."""
+        with self._lock:
+            names = sorted(set(self._seconds) | set(self._bytes))
+            out = {}
+            for name in names:
+                samples = sorted(self._seconds.get(name, ()))
+                entry: dict = {"count": len(samples)}
+                if samples:
+                    entry.update({
+                        "p50_ms": round(_percentile(samples, 0.50) * 1e3, 2),
+                        "p95_ms": round(_percentile(samples, 0.95) * 1e3, 2),
+                        "max_ms": round(samples[-1] * 1e3, 2),
+                        "total_ms": round(sum(samples) * 1e3, 2),
+                    })
+                if name in self._bytes:
+                    entry["bytes"] = self._bytes[name]
+                out[name] = entry
+            return out
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    # Nearest rank: always an observed value.
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+_current: contextvars.ContextVar[RunMetrics | None] = contextvars.ContextVar("run_metrics", default=None)
+
+
+@contextmanager
+def collect() -> Iterator[RunMetrics]:
+    """Collect the spans of everything run in this context (and contexts copied from it)."""
+    metrics = RunMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator form of span(); outside collect() it costs one ContextVar lookup."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = _current.get()
+            if metrics is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def add_bytes(name: str, count: int) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_bytes(name, count)
+
+
+def submit(pool, fn, *args, **kwargs):
+    """pool.submit that carries the caller's context (and so its metrics) into the worker."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
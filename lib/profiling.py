@@ -0,0 +1,157 @@
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# Seconds between stack samples; each sample walks every thread's stack once.
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL_MS", "10")) / 1000
+_MAX_DEPTH = 64
+# Memory snapshots are taken when traced memory grows past the last one, at
+# most this often, so the allocation report shows the run at its peak.
+_SNAPSHOT_INTERVAL = 1.0
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+def _where(filename: str, lineno: int, name: str = "") -> str:
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{lineno} {name}".rstrip()
+
+
+def _idle(frame) -> bool:
+    # Pool workers waiting for work and threads blocked on a future or a
+    # lock only add noise; waits on the network are kept.
+    code = frame.f_code
+    return code.co_filename.endswith("threading.py") or (
+        code.co_name == "_worker" and code.co_filename.endswith(os.path.join("futures", "thread.py"))
+    )
+
+
+class Profiler:
+    """
+    Sampling profile of everything the process runs while the block is open:
+    the stack of every thread every PROFILE_INTERVAL seconds (wall clock, so
+    time spent waiting on sites counts too) and, with `allocations`, the
+    Python allocations traced by tracemalloc. Sampling costs about a
+    millisecond per second of run; tracemalloc slows allocation-heavy code
+    several times over, which is why it is opt-in. Nothing is installed
+    outside the block.
+    """
+
+    def __init__(self, top: int = 15, allocations: bool = False, interval: float = PROFILE_INTERVAL):
+        self.top = top
+        self.allocations = allocations
+        self.interval = interval
+        self.samples = 0
+        self._self: Counter = Counter()
+        self._total: Counter = Counter()
+        self._sampling = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._owns_tracing = False
+        self._snapshot = None
+        self._snapshot_size = 0
+        self._started = 0.0
+        self._duration = 0.0
+
+    def __enter__(self) -> "Profiler":
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+            self._owns_tracing = True
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._duration = time.perf_counter() - self._started
+        if self.allocations:
+            self._take_snapshot(force=True)
+            if self._owns_tracing:
+                tracemalloc.stop()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last_snapshot = 0.0
+        while not self._stop.wait(self.interval):
+            start = time.perf_counter()
+            self._sample(own)
+            if self.allocations and start - last_snapshot >= _SNAPSHOT_INTERVAL:
+                self._take_snapshot()
+                last_snapshot = start
+            self._sampling += time.perf_counter() - start
+
+    def _sample(self, own: int) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own or _idle(frame):
+                continue
+            self.samples += 1
+            # Code objects are counted as they are; naming them waits for report().
+            self._self[frame.f_code] += 1
+            seen = set()
+            depth = 0
+            while frame is not None and depth < _MAX_DEPTH:
+                seen.add(frame.f_code)
+                frame = frame.f_back
+                depth += 1
+            self._total.update(seen)
+
+    def _take_snapshot(self, force: bool = False) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        if (force and self._snapshot is None) or current > self._snapshot_size:
+            self._snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            )
+            self._snapshot_size = current
+
+    def report(self) -> dict:
+        """Top-N functions by share of samples (self and inclusive) and top allocation sites."""
+        samples = max(1, self.samples)
+        report: dict = {
+            "duration": round(self._duration, 3),
+            "interval_ms": round(self.interval * 1e3, 1),
+            "samples": self.samples,
+            "sampler_ms": round(self._sampling * 1e3, 1),
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "self": [
+                {"function": _where(code.co_filename, code.co_firstlineno, code.co_name), "pct": round(100 * n / samples, 1)}
+                for code, n in self._self.most_common(self.top)
+            ],
+            "total": [
+                {"function": _where(code.co_filename, code.co_firstlineno, code.co_name), "pct": round(100 * n / samples, 1)}
+                for code, n in self._total.most_common(self.top)
+            ],
+        }
+        if self._snapshot is not None:
+            stats = self._snapshot.statistics("lineno")[:self.top]
+            report["memory"] = {
+                "traced_kib": round(self._snapshot_size / 1024, 1),
+                "top": [
+                    {
+                        "where": _where(stat.traceback[0].filename, stat.traceback[0].lineno),
+                        "kib": round(stat.size / 1024, 1),
+                        "count": stat.count,
+                    }
+                    for stat in stats
+                ],
+            }
+        return report
+
+
+def profiler_for(flag) -> Profiler | None:
+    """
+    The profiler asked for by a request's "profile" flag: none when it is
+    absent or false, with allocation tracing for "memory", CPU only otherwise.
+    """
+    if flag in (None, False, 0) or str(flag).lower() in ("", "0", "false"):
+        return None
+    return Profiler(allocations=str(flag).lower() == "memory")
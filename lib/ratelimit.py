@@ -0,0 +1,43 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket: refills `rate` tokens per second, holds at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def host_bucket(url: str, rate: float, capacity: int = 1) -> TokenBucket:
+    """Return the bucket shared by every caller hitting the same host as `url`."""
+    host = urlparse(url).netloc.lower()
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _buckets[host] = bucket
+        return bucket
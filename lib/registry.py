@@ -0,0 +1,49 @@
+import importlib
+import threading
+
+# Site key (module under api/scrape) -> scraper class name, in run order.
+# Modules are only imported when a handler needs their scraper, so listing
+# a site here costs nothing at cold start.
+SCRAPER_CLASSES = {
+    "cadaminuto": "CadaMinutoScraper",
+    "tnh1": "TNH1Scraper",
+    "gazetaweb": "GazetaWebScraper",
+    "tribunahoje": "TribunaHojeScraper",
+    "jornaldealagoas": "JornalDeAlagoasScraper",
+    "alagoas24horas": "Alagoas24HorasScraper",
+    "agoraalagoas": "AgoraAlagoasScraper",
+}
+SITE_KEYS = tuple(SCRAPER_CLASSES)
+# Each scraper's site_name, for callers that only report on a site (the
+# fan-out orchestrator) and have no reason to import it.
+SITE_NAMES = {
+    "cadaminuto": "cadaminuto.com.br",
+    "tnh1": "tnh1.com.br",
+    "gazetaweb": "gazetaweb.com",
+    "tribunahoje": "tribunahoje.com",
+    "jornaldealagoas": "jornaldealagoas.com.br",
+    "alagoas24horas": "alagoas24horas.com.br",
+    "agoraalagoas": "agoraalagoas.com",
+}
+
+_loaded: dict[str, type] = {}
+_lock = threading.Lock()
+
+
+def load_scraper(key: str) -> type:
+    """The scraper class of site `key`, importing its module on first use. KeyError for unknown sites."""
+    cls = _loaded.get(key)
+    if cls is None:
+        class_name = SCRAPER_CLASSES[key]
+        with _lock:
+            cls = _loaded.get(key)
+            if cls is None:
+                cls = getattr(importlib.import_module(f"api.scrape.{key}"), class_name)
+                if cls.site_name != SITE_NAMES[key]:
+                    raise RuntimeError(f"SITE_NAMES[{key!r}] is {SITE_NAMES[key]!r}, {class_name} says {cls.site_name!r}")
+                _loaded[key] = cls
+    return cls
+
+
+def load_scrapers(keys: list[str] | tuple[str, ...] = SITE_KEYS) -> list[type]:
+    return [load_scraper(key) for key in keys]
@@ -0,0 +1,88 @@
+import base64
+import gzip
+import io
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from lib.http_session import get_session
+
+# Headers worth replaying. Bodies are stored decoded, so the transfer
+# headers of the original response no longer apply.
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Location", "X-WP-TotalPages")
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests as usual and keeps every complete GET response."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.records: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        # Streamed bodies (image downloads) belong to their caller.
+        if request.method == "GET" and not kwargs.get("stream"):
+            record = {
+                "url": request.url,
+                "status": resp.status_code,
+                "headers": {k: resp.headers[k] for k in _KEPT_HEADERS if k in resp.headers},
+                "body": base64.b64encode(resp.content).decode("ascii"),
+            }
+            with self._lock:
+                self.records[request.url] = record
+        return resp
+
+    def save(self, path: str) -> int:
+        with self._lock:
+            records = list(self.records.values())
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            for record in records:
+                fh.write(json.dumps(record) + "\n")
+        return len(records)
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Serves GET requests from a recorded corpus and never touches the network:
+    anything not in the corpus fails like an unreachable host.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.records: dict[str, dict] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                record = json.loads(line)
+                self.records[record["url"]] = record
+        self.misses: list[str] = []
+
+    def send(self, request, **kwargs):
+        record = self.records.get(request.url) if request.method == "GET" else None
+        if record is None:
+            self.misses.append(f"{request.method} {request.url}")
+            raise requests.ConnectionError(f"{request.method} {request.url} is not in the replay corpus", request=request)
+        body = base64.b64decode(record["body"])
+        resp = requests.Response()
+        resp.status_code = record["status"]
+        resp.headers = CaseInsensitiveDict(record["headers"])
+        resp.headers["Content-Length"] = str(len(body))
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.raw = io.BytesIO(body)
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "OK" if resp.status_code < 400 else "Replayed"
+        return resp
+
+
+def install(adapter: HTTPAdapter) -> HTTPAdapter:
+    """Route the shared session's http(s) traffic through `adapter`."""
+    session = get_session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
@@ -0,0 +1,87 @@
+import contextvars
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+# vercel.json caps every function at 60s; keep room for the scrape_logs
+# writes and the HTTP response after the budget runs out.
+DEFAULT_TIME_BUDGET = float(os.environ.get("SCRAPE_TIME_BUDGET", "50"))
+# Seconds to fetch, upload and publish one article when there is no history.
+DEFAULT_ARTICLE_COST = 3.0
+# No estimate may claim more than this share of the budget, so one slow run
+# cannot price a site out of every later run.
+MAX_ARTICLE_COST_SHARE = 0.25
+# Shortest timeout handed to a request once the deadline is (nearly) spent.
+MIN_REQUEST_TIMEOUT = 1.0
+
+
+class Deadline:
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def allows(self, cost: float) -> bool:
+        return self.remaining() > cost
+
+
+_active: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def within(deadline: Deadline) -> Iterator[Deadline]:
+    """Bound the requests made in this context (and contexts copied from it) by `deadline`."""
+    token = _active.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _active.reset(token)
+
+
+def request_timeout(timeout: float, grace: float = 0.0) -> float:
+    """
+    `timeout`, cut to what the active deadline has left plus `grace`, so a
+    request started late cannot run the function past its limit.
+    """
+    deadline = _active.get()
+    if deadline is None:
+        return timeout
+    return max(MIN_REQUEST_TIMEOUT, min(timeout, deadline.remaining() + grace))
+
+
+@dataclass
+class SiteSchedule:
+    deadline: Deadline
+    article_cost: float = DEFAULT_ARTICLE_COST
+
+
+def estimate_article_cost(logs: list[dict]) -> float:
+    """
+    Median seconds per fetched article over the given scrape_logs rows.
+    Links already published cost no more than a lookup and are not counted;
+    rows logged before articles_fetched existed fall back to published plus
+    filtered.
+    """
+    samples = []
+    for row in logs:
+        processed = row.get("articles_fetched")
+        if processed is None:
+            processed = (row.get("articles_published") or 0) + (row.get("articles_filtered") or 0)
+        if row.get("duration_seconds") and processed:
+            samples.append(row["duration_seconds"] / processed)
+    return statistics.median(samples) if samples else DEFAULT_ARTICLE_COST
+
+
+def plan_schedules(site_names: list[str], deadline: Deadline, recent_logs: list[dict]) -> dict[str, SiteSchedule]:
+    """Build each site's schedule, estimating its article cost from its recent scrape_logs rows."""
+    schedules = {}
+    for site in site_names:
+        logs = [row for row in recent_logs if row.get("source_site") == site]
+        cost = min(estimate_article_cost(logs), deadline.budget * MAX_ARTICLE_COST_SHARE)
+        schedules[site] = SiteSchedule(deadline=deadline, article_cost=cost)
+    return schedules
@@ -1,12 +1,24 @@
+import hashlib
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 
-import requests
-from bs4 import BeautifulSoup
-
+from lib.checkpoint import (
+    FAILED, FETCHED, FILTERED, PUBLISHED, Checkpoint, clear_checkpoint, load_checkpoint, save_checkpoint,
+)
 from lib.classifier import classify_article
+from lib.feeds import FeedEntry, entry_paragraphs, parse_feed
 from lib.filter import is_violent_content
-from lib.supabase_client import is_url_published, log_published_url, log_scrape_result
+from lib.http_session import get_session
+from lib.local_state import get_local_state
+from lib.metrics import add_bytes, collect, span, submit
+from lib.parsing import Document, parse_html, parse_listing
+from lib.ratelimit import host_bucket
+from lib.scheduler import DEFAULT_TIME_BUDGET, Deadline, SiteSchedule, request_timeout, within
+from lib.story_dedup import Duplicate, claim_story, find_duplicate, release_story
+from lib.supabase_client import get_published_urls, log_published_url, log_scrape_result
 from lib.wordpress import upload_image, create_post
 
 HEADERS = {
@@ -20,17 +32,166 @@ HEADERS = {
 }
 
 
-def fetch_page(url: str, timeout: int = 15) -> BeautifulSoup | None:
+def fetch_page(url: str, timeout: int = 15) -> Document | None:
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=timeout)
-        resp.raise_for_status()
+        with span("fetch"):
+            resp = get_session().get(url, headers=HEADERS, timeout=request_timeout(timeout))
+            resp.raise_for_status()
+            add_bytes("fetch", len(resp.content))
         resp.encoding = resp.apparent_encoding or "utf-8"
-        return BeautifulSoup(resp.text, "lxml")
+        with span("parse_html"):
+            return parse_html(resp.text)
     except Exception as exc:
         print(f"[fetch] Error fetching {url}: {exc}")
         return None
 
 
+@dataclass
+class ListingPage:
+    url: str
+    soup: Document | None
+    changed: bool
+    validators: dict
+    content: bytes = b""
+    content_type: str = ""
+    # Set when the listing came from a feed instead of the HTML homepage.
+    entries: list[FeedEntry] = field(default_factory=list)
+
+
+def fetch_if_changed(
+    url: str,
+    timeout: int = 15,
+    parse: bool = True,
+    tags: tuple[str, ...] | None = None,
+    conditional: bool = True,
+) -> ListingPage | None:
+    """
+    Conditional GET against the validators remembered for `url`. The page
+    counts as unchanged on a 304 or when the body hashes the same as last
+    time; only a changed page is parsed, and only with `parse` (as a
+    listing of `tags` when given). Without `conditional` the page is always
+    fetched and counts as changed. None on errors, like fetch_page.
+    """
+    known = (get_local_state().get("validators", url) or {}) if conditional else {}
+    headers = dict(HEADERS)
+    if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+    try:
+        with span("fetch_listing"):
+            resp = get_session().get(url, headers=headers, timeout=request_timeout(timeout))
+            add_bytes("fetch_listing", len(resp.content))
+        if resp.status_code == 304:
+            return ListingPage(url=url, soup=None, changed=False, validators=known)
+        resp.raise_for_status()
+        validators = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "sha256": hashlib.sha256(resp.content).hexdigest(),
+        }
+        if validators["sha256"] == known.get("sha256"):
+            return ListingPage(url=url, soup=None, changed=False, validators=validators)
+        page = ListingPage(
+            url=url, soup=None, changed=True, validators=validators,
+            content=resp.content, content_type=resp.headers.get("Content-Type", ""),
+        )
+        if parse:
+            resp.encoding = resp.apparent_encoding or "utf-8"
+            with span("parse_listing"):
+                page.soup = parse_listing(resp.text, tags)
+        return page
+    except Exception as exc:
+        print(f"[fetch] Error fetching {url}: {exc}")
+        return None
+
+
+def remember_listing(page: ListingPage) -> None:
+    """Record the page's validators once everything it listed has been handled."""
+    get_local_state().set("validators", page.url, page.validators)
+
+
+_TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|fbclid|gclid|dclid|msclkid|igshid|mc_cid|mc_eid|_ga)$", re.IGNORECASE)
+
+
+def canonical_url(href: str, base_url: str) -> str | None:
+    """
+    Absolute form of `href`: joined with `base_url`, scheme and host
+    lowercased, fragment and tracking parameters dropped. The path is kept
+    as written, trailing slash included, because published_urls holds the
+    URLs in that form. None for anything that is not an http(s) link.
+    """
+    try:
+        parts = urlsplit(urljoin(base_url, href.strip()))
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+    netloc = parts.netloc.lower()
+    if (scheme, port) in (("http", 80), ("https", 443)):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = parts.query
+    if query:
+        query = urlencode([(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if not _TRACKING_PARAMS.match(k)])
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+class LinkCollector:
+    """
+    Ordered, duplicate-free article links of a listing.
+
+    Each href is made absolute and canonical (see canonical_url), kept when it
+    matches the site's precompiled `pattern` and not `exclude`, and
+    deduplicated in O(1) on a key that also ignores the scheme and a
+    trailing slash; the first form seen is the one returned. add() answers
+    False once `limit` links are in, so listings can stop reading early.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pattern: re.Pattern | None = None,
+        exclude: re.Pattern | None = None,
+        limit: int = 20,
+    ):
+        self.base_url = base_url
+        self.pattern = pattern
+        self.exclude = exclude
+        self.limit = limit
+        self._links: dict[str, str] = {}
+
+    @property
+    def full(self) -> bool:
+        return len(self._links) >= self.limit
+
+    def add(self, href) -> bool:
+        """Offer one href; returns whether more links are still wanted."""
+        if self.full:
+            return False
+        if not isinstance(href, str) or not href.strip():
+            return True
+        url = canonical_url(href, self.base_url)
+        if url is None:
+            return True
+        if self.pattern is not None and not self.pattern.search(url):
+            return True
+        if self.exclude is not None and self.exclude.search(url):
+            return True
+        key = url.split("://", 1)[1].rstrip("/")
+        self._links.setdefault(key, url)
+        return not self.full
+
+    def __contains__(self, href: str) -> bool:
+        url = canonical_url(href, self.base_url)
+        return url is not None and url.split("://", 1)[1].rstrip("/") in self._links
+
+    @property
+    def links(self) -> list[str]:
+        return list(self._links.values())
+
+
 @dataclass
 class Article:
     url: str
@@ -46,75 +207,397 @@ class ScrapeResult:
     articles_found: int = 0
     articles_published: int = 0
     articles_filtered: int = 0
+    # Links that went past the published_urls check, i.e. cost a real fetch.
+    articles_fetched: int = 0
     error: str | None = None
     published: list[dict] = field(default_factory=list)
+    # Links left unprocessed when the time budget ran out.
+    pending: list[str] = field(default_factory=list)
+    duration: float = 0.0
+    # True when the run continued an interrupted one from its checkpoint.
+    resumed: bool = False
+    # True when the listing had not changed since the last complete run.
+    unchanged: bool = False
+    # Listed links absent from / already in the previous listing snapshot.
+    new_links: int = 0
+    carried_links: int = 0
+    # Articles skipped as copies of a story another source published first.
+    duplicates: list[dict] = field(default_factory=list)
+    # Per-stage timings and byte counts (see lib.metrics).
+    metrics: dict[str, dict] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        """Per-site entry of the run_all response."""
+        return {
+            "site": self.source_site,
+            "found": self.articles_found,
+            "published": self.articles_published,
+            "filtered": self.articles_filtered,
+            "fetched": self.articles_fetched,
+            "error": self.error,
+            "pending": len(self.pending),
+            "resumed": self.resumed,
+            "unchanged": self.unchanged,
+            "new": self.new_links,
+            "carried": self.carried_links,
+            "duplicates": self.duplicates,
+            "duration": round(self.duration, 3),
+            "metrics": self.metrics,
+        }
+
+
+@dataclass
+class PreparedArticle:
+    url: str
+    article: Article
+    category: str
+    signature: tuple[int, ...] | None = None
+    # Set when another source already ran the same story.
+    duplicate_of: Duplicate | None = None
 
 
 class BaseScraper:
     site_name: str = ""
     listing_url: str = ""
+    # Politeness: on average one request every `request_delay` seconds per host,
+    # with at most `max_concurrency` article pages in flight at once.
     request_delay: float = 1.5
+    max_concurrency: int = 4
+    # RSS/Atom or /wp-json/wp/v2/posts URLs tried, in order, before the
+    # HTML listing; at most `max_links` of their entries are used.
+    feed_urls: tuple[str, ...] = ()
+    max_links: int = 20
+    # The only elements get_article_links looks at, so the listing can be
+    # stream parsed for just these (simple selectors only). None parses it whole.
+    listing_tags: tuple[str, ...] | None = ("a",)
+    # Article URLs, searched in the canonical absolute URL of every anchor;
+    # relative hrefs are resolved against `link_base` (the listing URL by
+    # default).
+    link_pattern: re.Pattern | None = None
+    link_exclude: re.Pattern | None = None
+    link_base: str = ""
 
-    def get_article_links(self, soup: BeautifulSoup) -> list[str]:
-        raise NotImplementedError
+    def link_collector(self) -> LinkCollector:
+        return LinkCollector(self.link_base or self.listing_url, self.link_pattern, self.link_exclude, self.max_links)
 
-    def parse_article(self, soup: BeautifulSoup, url: str) -> Article | None:
+    def get_article_links(self, soup: Document) -> list[str]:
+        collector = self.link_collector()
+        for a in soup.select("a[href]"):
+            if not collector.add(a.get("href")):
+                break
+        return collector.links
+
+    def parse_article(self, soup: Document, url: str) -> Article | None:
         raise NotImplementedError
 
-    def run(self, credentials: dict, blacklist: list[str] | None = None) -> ScrapeResult:
-        result = ScrapeResult(source_site=self.site_name)
-        try:
-            soup = fetch_page(self.listing_url)
-            if soup is None:
-                result.error = "Failed to fetch listing page"
-                log_scrape_result(self.site_name, 0, 0, 0, result.error)
-                return result
+    def _throttle(self, url: str) -> None:
+        rate = 1 / self.request_delay if self.request_delay > 0 else 0
+        with span("throttle"):
+            host_bucket(url, rate, self.max_concurrency).acquire()
 
-            links = self.get_article_links(soup)
-            result.articles_found = len(links)
+    def fetch(self, url: str) -> Document | None:
+        self._throttle(url)
+        return fetch_page(url)
 
-            for link in links:
-                try:
-                    self._process_article(link, result, credentials, blacklist)
-                except Exception as exc:
-                    result.articles_filtered += 1
-                    print(f"[{self.site_name}] Error processing {link}: {exc}")
-                time.sleep(self.request_delay)
+    def fetch_listing(self, conditional: bool = True) -> ListingPage | None:
+        # Feeds first: one small response with links and, usually, the full
+        # articles. The HTML homepage is the fallback when none answers with
+        # entries.
+        for feed_url in self.feed_urls:
+            self._throttle(feed_url)
+            page = fetch_if_changed(feed_url, parse=False, conditional=conditional)
+            if page is None:
+                continue
+            if not page.changed:
+                return page
+            try:
+                page.entries = parse_feed(page.content, page.content_type)
+            except Exception as exc:
+                print(f"[{self.site_name}] Unreadable feed {feed_url}: {exc}")
+                continue
+            if page.entries:
+                return page
+        self._throttle(self.listing_url)
+        return fetch_if_changed(self.listing_url, tags=self.listing_tags, conditional=conditional)
+
+    def read_listing(self, listing: ListingPage) -> tuple[list[str], dict[str, Article]]:
+        """Links of a changed listing, plus the articles a feed already carried in full."""
+        if not listing.entries:
+            return self.get_article_links(listing.soup), {}
+        collector = LinkCollector(listing.url, limit=self.max_links)
+        articles = {}
+        for entry in listing.entries:
+            entry.url = canonical_url(entry.url, listing.url) or ""
+            if not entry.url or entry.url in collector:
+                continue
+            more = collector.add(entry.url)
+            article = self.article_from_feed(entry)
+            if article is not None:
+                articles[entry.url] = article
+            if not more:
+                break
+        return collector.links, articles
+
+    def article_from_feed(self, entry: FeedEntry) -> Article | None:
+        """The article as the feed carries it, or None to fetch its page instead."""
+        paragraphs = entry_paragraphs(entry)
+        if not entry.title or not paragraphs:
+            return None
+        image_url = entry.image_url
+        if image_url is None:
+            img = parse_html(entry.content_html).select_one("img[src]")
+            image_url = img.get("src") if img else None
+        body = "\n".join(paragraphs)
+        return Article(url=entry.url, title=entry.title, body=body, image_url=image_url, first_paragraph=paragraphs[0])
+
+    def run(
+        self,
+        credentials: dict,
+        blacklist: list[str] | None = None,
+        schedule: SiteSchedule | None = None,
+    ) -> ScrapeResult:
+        if schedule is None:
+            schedule = SiteSchedule(deadline=Deadline(DEFAULT_TIME_BUDGET))
+        # Every request of the run, article fetches in the pool included,
+        # gets at most what the deadline has left.
+        with collect() as metrics, within(schedule.deadline):
+            result = self._run(credentials, blacklist, schedule)
+        result.metrics = metrics.summary()
+        # The posts are already out; a failed log must not hide them.
+        try:
+            log_scrape_result(
+                source_site=self.site_name,
+                articles_found=result.articles_found,
+                articles_published=result.articles_published,
+                articles_filtered=result.articles_filtered,
+                articles_fetched=result.articles_fetched,
+                error=result.error,
+                duration_seconds=round(result.duration, 3),
+                pending_urls=result.pending,
+                metrics=result.metrics,
+            )
+        except Exception as exc:
+            print(f"[{self.site_name}] Could not log scrape result: {exc}")
+        return result
+
+    def _run(
+        self,
+        credentials: dict,
+        blacklist: list[str] | None,
+        schedule: SiteSchedule,
+    ) -> ScrapeResult:
+        started = time.monotonic()
+        deadline, cost = schedule.deadline, schedule.article_cost
+        result = ScrapeResult(source_site=self.site_name)
+        checkpoint = None
+        listing = None
+        carried: list[str] = []
+        prefetched: dict[str, Article] = {}
+        try:
+            # Links an interrupted earlier run left unprocessed. The listing
+            # is still read: what is new there goes first, and the leftovers
+            # get whatever budget remains.
+            resumed = self._load_checkpoint()
+            leftovers = resumed.pending() if resumed is not None else []
+            new: list[str] = []
+            if deadline.allows(cost):
+                listing = self.fetch_listing()
+                if listing is None:
+                    result.error = "Failed to fetch listing page"
+                elif not listing.changed:
+                    result.unchanged = True
+                else:
+                    listed, prefetched = self.read_listing(listing)
+                    carried, new = self._diff_links(listed)
+                    result.articles_found = len(listed)
+                    result.new_links, result.carried_links = len(new), len(carried)
+            if leftovers:
+                # Leftovers still listed are unhandled, so already among the new links.
+                listed_new = set(new)
+                leftovers = [link for link in leftovers if link not in listed_new]
+                result.resumed = True
+                result.articles_found += len(leftovers)
+            if new or leftovers:
+                checkpoint = Checkpoint(
+                    site=self.site_name,
+                    links=new + leftovers,
+                    # Leftovers keep their age, so they still expire after CHECKPOINT_TTL.
+                    started_at=resumed.started_at if leftovers else time.time(),
+                    persisted=resumed is not None,
+                )
+                self._process_links(new + leftovers, result, credentials, blacklist, deadline, cost, checkpoint, prefetched)
 
         except Exception as exc:
             result.error = str(exc)
             print(f"[{self.site_name}] Fatal error: {exc}")
 
-        log_scrape_result(
-            source_site=self.site_name,
-            articles_found=result.articles_found,
-            articles_published=result.articles_published,
-            articles_filtered=result.articles_filtered,
-            error=result.error,
-        )
+        if checkpoint is not None:
+            self._store_checkpoint(checkpoint)
+        if listing is not None and listing.changed:
+            self._remember_links(carried, checkpoint)
+        elif checkpoint is not None and result.resumed:
+            self._remember_resumed_links(checkpoint)
+        # Only a fully handled listing may short-circuit the next run: after a
+        # failed link the listing must read as changed, or it is never retried.
+        if listing is not None and listing.changed and result.error is None and self._fully_handled(checkpoint):
+            remember_listing(listing)
+
+        result.duration = time.monotonic() - started
         return result
 
-    def _process_article(self, url: str, result: ScrapeResult, credentials: dict, blacklist: list[str] | None) -> None:
-        if is_url_published(url):
-            result.articles_filtered += 1
-            return
+    def _diff_links(self, listed: list[str]) -> tuple[list[str], list[str]]:
+        """Split the listing into links handled by earlier runs and new ones."""
+        previous = set(get_local_state().get("links", self.site_name) or ())
+        carried = [link for link in listed if link in previous]
+        new = [link for link in listed if link not in previous]
+        return carried, new
+
+    @staticmethod
+    def _fully_handled(checkpoint: Checkpoint | None) -> bool:
+        if checkpoint is None:
+            return True
+        return not checkpoint.pending() and FAILED not in checkpoint.states.values()
+
+    @staticmethod
+    def _handled_links(checkpoint: Checkpoint) -> list[str]:
+        return [link for link in checkpoint.links if checkpoint.states.get(link) in (FILTERED, PUBLISHED)]
 
-        time.sleep(self.request_delay)
-        soup = fetch_page(url)
-        if soup is None:
-            result.articles_filtered += 1
-            return
+    def _remember_links(self, carried: list[str], checkpoint: Checkpoint | None) -> None:
+        # Failed and unreached links stay out of the snapshot so the next run
+        # tries them again; links that left the listing are dropped with it.
+        handled = self._handled_links(checkpoint) if checkpoint is not None else []
+        get_local_state().set("links", self.site_name, carried + handled)
 
-        article = self.parse_article(soup, url)
+    def _remember_resumed_links(self, checkpoint: Checkpoint) -> None:
+        # A resumed run whose listing was unchanged or unreadable has no
+        # listing to snapshot: what it finished joins the one its original
+        # run left, instead of counting as new next time.
+        previous = get_local_state().get("links", self.site_name) or []
+        merged = list(dict.fromkeys(previous + self._handled_links(checkpoint)))
+        get_local_state().set("links", self.site_name, merged)
+
+    def _load_checkpoint(self) -> Checkpoint | None:
+        try:
+            return load_checkpoint(self.site_name)
+        except Exception as exc:
+            print(f"[{self.site_name}] Could not load checkpoint: {exc}")
+            return None
+
+    def _store_checkpoint(self, checkpoint: Checkpoint) -> None:
+        try:
+            if checkpoint.pending():
+                save_checkpoint(checkpoint)
+            else:
+                clear_checkpoint(checkpoint)
+        except Exception as exc:
+            print(f"[{self.site_name}] Could not store checkpoint: {exc}")
+
+    def _process_links(
+        self,
+        links: list[str],
+        result: ScrapeResult,
+        credentials: dict,
+        blacklist: list[str] | None,
+        deadline: Deadline,
+        cost: float,
+        checkpoint: Checkpoint,
+        prefetched: dict[str, Article],
+    ) -> None:
+        published = get_published_urls(links) if links else set()
+
+        # Article pages are fetched and parsed concurrently, but published
+        # strictly in listing order as each future resolves. Once the deadline
+        # no longer leaves room for another article, the rest is reported as
+        # pending instead of being waited for.
+        pool = ThreadPoolExecutor(max_workers=max(1, self.max_concurrency))
+        try:
+            futures = [
+                submit(pool, self._prepare_article, link, blacklist, published, checkpoint, prefetched.get(link))
+                for link in links
+            ]
+            for index, (link, future) in enumerate(zip(links, futures)):
+                if not deadline.allows(cost):
+                    result.pending = links[index:]
+                    break
+                try:
+                    prepared = future.result(timeout=deadline.remaining() - cost)
+                    if prepared is None:
+                        result.articles_filtered += 1
+                        checkpoint.mark(link, FILTERED)
+                        continue
+                    if prepared.duplicate_of is None and prepared.signature is not None:
+                        prepared.duplicate_of = claim_story(
+                            link, self.site_name, prepared.article.title, prepared.signature
+                        )
+                    if prepared.duplicate_of is not None:
+                        self._record_duplicate(prepared, result)
+                        checkpoint.mark(link, FILTERED)
+                        continue
+                    try:
+                        self._publish_article(prepared, result, credentials)
+                    except Exception:
+                        if prepared.signature is not None:
+                            release_story(link)
+                        raise
+                    checkpoint.mark(link, PUBLISHED)
+                    # Publishing is the step worth not repeating after a cut-off.
+                    self._store_checkpoint(checkpoint)
+                except FutureTimeout:
+                    result.pending = links[index:]
+                    break
+                except Exception as exc:
+                    result.articles_filtered += 1
+                    checkpoint.mark(link, FAILED)
+                    print(f"[{self.site_name}] Error processing {link}: {exc}")
+        finally:
+            pool.shutdown(wait=not result.pending, cancel_futures=True)
+        handled = links[:len(links) - len(result.pending)]
+        result.articles_fetched += sum(1 for link in handled if link not in published)
+
+    def _prepare_article(
+        self,
+        url: str,
+        blacklist: list[str] | None,
+        published: set[str],
+        checkpoint: Checkpoint,
+        article: Article | None = None,
+    ) -> PreparedArticle | None:
+        if url in published:
+            return None
+
+        # Feeds may already have carried the article in full.
         if article is None:
-            result.articles_filtered += 1
-            return
+            soup = self.fetch(url)
+            if soup is None:
+                # Raised rather than filtered so the link is retried next run.
+                raise RuntimeError("article page could not be fetched")
+            with span("parse_article"):
+                article = self.parse_article(soup, url)
+        checkpoint.mark(url, FETCHED)
+        if article is None:
+            return None
 
         if is_violent_content(article.title, article.body, blacklist):
-            result.articles_filtered += 1
-            return
+            return None
 
+        signature, duplicate = find_duplicate(url, article.title, article.body)
         category = classify_article(article.title, article.first_paragraph or article.body[:300])
+        return PreparedArticle(url=url, article=article, category=category, signature=signature, duplicate_of=duplicate)
+
+    def _record_duplicate(self, prepared: PreparedArticle, result: ScrapeResult) -> None:
+        first = prepared.duplicate_of
+        result.articles_filtered += 1
+        result.duplicates.append({
+            "url": prepared.url,
+            "title": prepared.article.title,
+            "first_url": first.url,
+            "first_source": first.source_site,
+            "similarity": first.similarity,
+        })
+        print(f"[{self.site_name}] Duplicate of {first.source_site}: {prepared.url} ~ {first.url}")
+
+    def _publish_article(self, prepared: PreparedArticle, result: ScrapeResult, credentials: dict) -> None:
+        url, article, category = prepared.url, prepared.article, prepared.category
 
         media_id = None
         if article.image_url:
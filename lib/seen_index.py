@@ -0,0 +1,140 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+
+_MAGIC = b"CFSEEN01"
+# magic, bit count, hash count, urls added, last published_urls.id synced
+_HEADER = struct.Struct("<8sQIQq")
+
+
+class SeenUrlIndex:
+    """
+    Memory-mapped Bloom filter of published URLs.
+
+    A miss means the URL was never added; a hit may be a false positive and
+    has to be confirmed against Supabase.
+    """
+
+    def __init__(self, path: str, capacity: int = 200_000, error_rate: float = 0.01):
+        self.path = path
+        self.positive_checks = 0
+        self.false_positives = 0
+        self._lock = threading.Lock()
+        if not self._open():
+            self._create(capacity, error_rate)
+            self._open()
+
+    def _create(self, capacity: int, error_rate: float) -> None:
+        nbits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        nbits += -nbits % 8
+        k = max(1, round(nbits / capacity * math.log(2)))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, nbits, k, 0, 0))
+            fh.truncate(_HEADER.size + nbits // 8)
+        os.replace(tmp_path, self.path)
+
+    def _open(self) -> bool:
+        try:
+            fh = open(self.path, "r+b")
+        except FileNotFoundError:
+            return False
+        with fh:
+            header = fh.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:8] != _MAGIC:
+                return False
+            _, nbits, k, _, _ = _HEADER.unpack(header)
+            if os.fstat(fh.fileno()).st_size != _HEADER.size + nbits // 8:
+                return False
+            self._map = mmap.mmap(fh.fileno(), 0)
+        self.nbits = nbits
+        self.hashes = k
+        return True
+
+    def _header(self) -> tuple:
+        return _HEADER.unpack_from(self._map, 0)
+
+    def _write_header(self, count: int, last_synced_id: int) -> None:
+        _HEADER.pack_into(self._map, 0, _MAGIC, self.nbits, self.hashes, count, last_synced_id)
+
+    @property
+    def count(self) -> int:
+        return self._header()[3]
+
+    @property
+    def last_synced_id(self) -> int:
+        return self._header()[4]
+
+    @last_synced_id.setter
+    def last_synced_id(self, value: int) -> None:
+        with self._lock:
+            self._write_header(self.count, value)
+
+    def _positions(self, url: str) -> list[int]:
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.nbits for i in range(self.hashes)]
+
+    def __contains__(self, url: str) -> bool:
+        offset = _HEADER.size
+        return all(self._map[offset + pos // 8] & (1 << (pos % 8)) for pos in self._positions(url))
+
+    def add(self, url: str) -> None:
+        offset = _HEADER.size
+        with self._lock:
+            for pos in self._positions(url):
+                self._map[offset + pos // 8] |= 1 << (pos % 8)
+            _, _, _, count, last_synced_id = self._header()
+            self._write_header(count + 1, last_synced_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._map[_HEADER.size:] = bytes(self.nbits // 8)
+            self._write_header(0, 0)
+            self.positive_checks = 0
+            self.false_positives = 0
+
+    def record_checks(self, positives: int, false_positives: int) -> None:
+        with self._lock:
+            self.positive_checks += positives
+            self.false_positives += false_positives
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def estimated_fp_rate(self) -> float:
+        return (1 - math.exp(-self.hashes * self.count / self.nbits)) ** self.hashes
+
+    def stats(self) -> dict:
+        observed = self.false_positives / self.positive_checks if self.positive_checks else None
+        return {
+            "urls": self.count,
+            "bits": self.nbits,
+            "hashes": self.hashes,
+            "estimated_fp_rate": round(self.estimated_fp_rate(), 6),
+            "observed_fp_rate": round(observed, 6) if observed is not None else None,
+            "positive_checks": self.positive_checks,
+            "false_positives": self.false_positives,
+        }
+
+
+def merge_stats(stats: list[dict]) -> dict:
+    """
+    One stats() view of the indexes of several instances (the fanned-out
+    site runs): the most complete index stands for the table, the lookups
+    of all of them add up.
+    """
+    stats = [entry for entry in stats if entry]
+    if not stats:
+        return {}
+    merged = dict(max(stats, key=lambda entry: entry.get("urls", 0)))
+    merged["positive_checks"] = sum(entry.get("positive_checks", 0) for entry in stats)
+    merged["false_positives"] = sum(entry.get("false_positives", 0) for entry in stats)
+    checks = merged["positive_checks"]
+    merged["observed_fp_rate"] = round(merged["false_positives"] / checks, 6) if checks else None
+    if any("warm" in entry for entry in stats):
+        merged["warm"] = all(entry.get("warm", False) for entry in stats)
+    return merged
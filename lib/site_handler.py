@@ -0,0 +1,88 @@
+import json
+import os
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler
+
+from lib.auth import authenticate
+from lib.http_session import connection_stats
+from lib.profiling import profiler_for
+from lib.scheduler import DEFAULT_TIME_BUDGET, Deadline, SiteSchedule, plan_schedules
+from lib.scraper_base import BaseScraper
+from lib.supabase_client import get_filter_keywords, get_recent_scrape_logs, seen_index_stats
+
+REQUIRED_FIELDS = {"wp_url", "wp_username", "wp_app_password"}
+
+
+def load_schedules(site_names: list[str], deadline: Deadline) -> dict[str, SiteSchedule]:
+    try:
+        recent_logs = get_recent_scrape_logs()
+    except Exception as exc:
+        print(f"[schedule] Could not load recent scrape logs: {exc}")
+        recent_logs = []
+    return plan_schedules(site_names, deadline, recent_logs)
+
+
+def run_site(scraper_cls: type[BaseScraper], credentials: dict, budget: float | None = None) -> dict:
+    """Run one scraper and answer in the same shape as run_all."""
+    deadline = Deadline(budget or DEFAULT_TIME_BUDGET)
+    connections = connection_stats()
+    schedule = load_schedules([scraper_cls.site_name], deadline)[scraper_cls.site_name]
+    result = scraper_cls().run(credentials=credentials, blacklist=get_filter_keywords(), schedule=schedule)
+    return {
+        "results": [result.summary()],
+        "connections": connection_stats(since=connections),
+        "seen_index": seen_index_stats(),
+    }
+
+
+class ScraperHandler(BaseHTTPRequestHandler):
+    """
+    POST handler shared by the api/scrape/<site>.py endpoints: same payload and
+    Bearer authentication as /api/webhook/receive, but only `scraper_cls` runs.
+    An optional "budget" field (seconds) caps the run below the default, and
+    "profile" (true or "memory", see lib.profiling) adds the run's profile
+    to the answer.
+    """
+
+    scraper_cls: type[BaseScraper]
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length)) if length else {}
+        except json.JSONDecodeError:
+            self._respond(400, {"error": "Invalid JSON body"})
+            return
+
+        api_secret = body.get("api_secret_key") or os.environ.get("API_SECRET_KEY", "")
+        if not authenticate(dict(self.headers), api_secret):
+            self._respond(401, {"error": "Unauthorized"})
+            return
+
+        missing = REQUIRED_FIELDS - body.keys()
+        if missing:
+            self._respond(400, {"error": f"Missing fields: {list(missing)}"})
+            return
+
+        credentials = {
+            "wp_url": body["wp_url"],
+            "wp_username": body["wp_username"],
+            "wp_app_password": body["wp_app_password"],
+            "post_status": body.get("post_status", "publish"),
+        }
+        budget = body.get("budget")
+        profiler = profiler_for(body.get("profile"))
+        try:
+            with profiler or nullcontext():
+                data = run_site(self.scraper_cls, credentials, float(budget) if budget else None)
+            if profiler is not None:
+                data["profile"] = profiler.report()
+            self._respond(200, data)
+        except Exception as exc:
+            self._respond(500, {"error": str(exc)})
+
+    def _respond(self, code: int, data: dict) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode())
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from lib.metrics import timed
+from lib.supabase_client import claim_story_bands, get_story_bands, release_story_bands
+from lib.textnorm import normalize
+
+# Estimated Jaccard similarity of two articles' word shingles from which they
+# count as the same story.
+DUPLICATE_THRESHOLD = float(os.environ.get("DUPLICATE_THRESHOLD", "0.6"))
+# How long a published story keeps later copies out.
+DUPLICATE_WINDOW_HOURS = float(os.environ.get("DUPLICATE_WINDOW_HOURS", "48"))
+
+_SHINGLE_WORDS = 3
+# MinHash of 64 values in 16 bands of 4: stories sharing about half of their
+# shingles already meet in some band, and the threshold decides from there.
+_BANDS = 16
+_ROWS = 4
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(_BANDS * _ROWS)]
+_BAND = struct.Struct(f"<{_ROWS}Q")
+
+
+def signature(title: str, body: str) -> tuple[int, ...] | None:
+    """MinHash signature of the normalized title and body, None for empty texts."""
+    words = normalize(title).text.split() + normalize(body).text.split()
+    if not words:
+        return None
+    size = min(_SHINGLE_WORDS, len(words))
+    hashes = {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode(), digest_size=8).digest(), "little")
+        for i in range(len(words) - size + 1)
+    }
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def band_keys(sig: tuple[int, ...], day: str) -> list[str]:
+    # The day is part of the key so that claims expire with the window
+    # instead of holding a band forever.
+    return [
+        f"{day}:{band}:{hashlib.blake2b(_BAND.pack(*sig[band * _ROWS:(band + 1) * _ROWS]), digest_size=8).hexdigest()}"
+        for band in range(_BANDS)
+    ]
+
+
+def _window_days(now: datetime | None = None) -> list[str]:
+    now = now or datetime.now(timezone.utc)
+    day = (now - timedelta(hours=DUPLICATE_WINDOW_HOURS)).date()
+    days = []
+    while day <= now.date():
+        days.append(day.strftime("%Y%m%d"))
+        day += timedelta(days=1)
+    return days
+
+
+@dataclass
+class Story:
+    url: str
+    source_site: str
+    title: str
+    signature: tuple[int, ...]
+    claimed_at: float
+
+
+@dataclass
+class Duplicate:
+    """The story an article duplicates, as first published."""
+
+    url: str
+    source_site: str
+    title: str
+    similarity: float
+
+
+def _story_from_row(row: dict) -> Story:
+    claimed_at = datetime.fromisoformat(row["created_at"]).timestamp() if row.get("created_at") else 0.0
+    return Story(row["url"], row["source_site"], row.get("title") or "", tuple(row["signature"]), claimed_at)
+
+
+def _first_similar(stories: list[Story], sig: tuple[int, ...], url: str, before: float = float("inf")) -> Duplicate | None:
+    first = None
+    for story in stories:
+        if story.url == url or story.claimed_at > before:
+            continue
+        score = similarity(sig, story.signature)
+        if score >= DUPLICATE_THRESHOLD and (first is None or story.claimed_at < first[0].claimed_at):
+            first = (story, score)
+    if first is None:
+        return None
+    story, score = first
+    return Duplicate(url=story.url, source_site=story.source_site, title=story.title, similarity=round(score, 3))
+
+
+class StoryIndex:
+    """Band index of the stories this process has claimed."""
+
+    def __init__(self):
+        self._bands: dict[str, list[Story]] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self, keys: list[str]) -> list[Story]:
+        with self._lock:
+            return [story for key in keys for story in self._bands.get(key, ())]
+
+    def add(self, story: Story, keys: list[str]) -> None:
+        with self._lock:
+            days = set(_window_days())
+            for key in [key for key in self._bands if key.split(":", 1)[0] not in days]:
+                del self._bands[key]
+            for key in keys:
+                self._bands.setdefault(key, []).append(story)
+
+    def remove(self, url: str) -> None:
+        with self._lock:
+            for key, stories in self._bands.items():
+                stories[:] = [story for story in stories if story.url != url]
+
+
+_index = StoryIndex()
+# Serializes check-and-claim between the sites running in this process.
+_claim_lock = threading.Lock()
+
+
+def _window_keys(sig: tuple[int, ...]) -> list[str]:
+    return [key for day in _window_days() for key in band_keys(sig, day)]
+
+
+@timed("dedup.find")
+def find_duplicate(url: str, title: str, body: str) -> tuple[tuple[int, ...] | None, Duplicate | None]:
+    """
+    Signature of the article and the earliest story it duplicates, if any,
+    among the local index and the story_fingerprints table. Advisory only:
+    claim_story decides at publish time.
+    """
+    sig = signature(title, body)
+    if sig is None:
+        return None, None
+    keys = _window_keys(sig)
+    stories = _index.candidates(keys)
+    try:
+        stories += [_story_from_row(row) for row in get_story_bands(keys)]
+    except Exception as exc:
+        print(f"[story_dedup] Lookup failed: {exc}")
+    return sig, _first_similar(stories, sig, url)
+
+
+@timed("dedup.claim")
+def claim_story(url: str, source_site: str, title: str, sig: tuple[int, ...]) -> Duplicate | None:
+    """
+    Claim the story before it is published. Returns None when this article
+    may go ahead, or the story claimed first when it is a duplicate.
+
+    Each band row is inserted only if free, so of two invocations claiming
+    the same story at once, the one whose rows landed first keeps it.
+    """
+    with _claim_lock:
+        duplicate = _first_similar(_index.candidates(_window_keys(sig)), sig, url)
+        if duplicate is not None:
+            return duplicate
+        keys = band_keys(sig, _window_days()[-1])
+        _index.add(Story(url, source_site, title, sig, time.time()), keys)
+
+    rows = [
+        {"band_key": key, "url": url, "source_site": source_site, "title": title, "signature": list(sig)}
+        for key in keys
+    ]
+    try:
+        claimed = claim_story_bands(rows)
+        lost = [key for key in keys if key not in claimed]
+        if not lost:
+            return None
+        ours = min((_story_from_row(row).claimed_at for row in claimed.values()), default=float("inf"))
+        holders = [_story_from_row(row) for row in get_story_bands(lost)]
+    except Exception as exc:
+        # Without Supabase the local claim is all there is.
+        print(f"[story_dedup] Claim failed: {exc}")
+        return None
+
+    duplicate = _first_similar(holders, sig, url, before=ours)
+    if duplicate is not None:
+        release_story(url)
+    return duplicate
+
+
+def release_story(url: str) -> None:
+    """Give up the claim of an article that was not published after all."""
+    _index.remove(url)
+    try:
+        release_story_bands(url)
+    except Exception as exc:
+        print(f"[story_dedup] Release failed: {exc}")
@@ -1,24 +1,192 @@
 import os
-from supabase import create_client, Client
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING
 
-_client: Client | None = None
+from lib.metrics import timed
+from lib.seen_index import SeenUrlIndex
 
+if TYPE_CHECKING:
+    from supabase import Client
 
-def get_client() -> Client:
+_client: "Client | None" = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> "Client":
     global _client
     if _client is None:
-        url = os.environ["SUPABASE_URL"]
-        key = os.environ["SUPABASE_SERVICE_KEY"]
-        _client = create_client(url, key)
+        # Scrapers run in parallel threads; only one of them may build the client.
+        with _client_lock:
+            if _client is None:
+                # supabase pulls in httpx, pydantic and friends (about 0.4s),
+                # so it is only imported by the first call that talks to it.
+                from supabase import create_client
+
+                url = os.environ["SUPABASE_URL"]
+                key = os.environ["SUPABASE_SERVICE_KEY"]
+                _client = create_client(url, key)
     return _client
 
 
+SEEN_INDEX_PATH = os.environ.get("SEEN_INDEX_PATH") or os.path.join(
+    tempfile.gettempdir(), "confaa_seen_urls.bloom"
+)
+# How stale the local index may get before it pulls rows published elsewhere.
+# A URL another instance published within this window can still miss.
+SEEN_INDEX_SYNC_SECONDS = float(os.environ.get("SEEN_INDEX_SYNC_SECONDS", "30"))
+# Ids below the last one synced that are read again on every sync: inserts
+# running in parallel can commit out of id order, so a row with a lower id
+# may only show up after a higher one was already synced.
+SEEN_INDEX_SYNC_OVERLAP = int(os.environ.get("SEEN_INDEX_SYNC_OVERLAP", "200"))
+# Pages read per sync. An index starting from an empty /tmp catches up a few
+# pages per lookup instead of reading the whole table on the first one.
+SEEN_INDEX_SYNC_MAX_PAGES = int(os.environ.get("SEEN_INDEX_SYNC_MAX_PAGES", "5"))
+_SYNC_PAGE_SIZE = 1000
+
+_seen: SeenUrlIndex | None = None
+_seen_disabled = False
+# Whether the index holds every row up to the end of the table; until then
+# lookups go to Supabase.
+_seen_warm = False
+_seen_synced_at: float | None = None
+_seen_lock = threading.Lock()
+_seen_sync_lock = threading.Lock()
+
+
+@timed("supabase.sync_seen_index")
+def _sync_seen_index(index: SeenUrlIndex, max_pages: int | None = SEEN_INDEX_SYNC_MAX_PAGES) -> bool:
+    """Add rows past last_synced_id, at most `max_pages` pages. True once it reached the end of the table."""
+    # published_urls.id is an identity column and rows are read in id order,
+    # so the index always holds every row up to last_synced_id, except for
+    # late commits within the overlap.
+    client = get_client()
+    cursor = max(0, index.last_synced_id - SEEN_INDEX_SYNC_OVERLAP)
+    pages = 0
+    caught_up = False
+    while max_pages is None or pages < max_pages:
+        result = (
+            client.table("published_urls")
+            .select("id,url")
+            .gt("id", cursor)
+            .order("id")
+            .limit(_SYNC_PAGE_SIZE)
+            .execute()
+        )
+        pages += 1
+        for row in result.data:
+            # The overlap is mostly rows already in; re-adding them would
+            # only inflate the count the false positive estimate uses.
+            if row["url"] not in index:
+                index.add(row["url"])
+        if result.data:
+            cursor = result.data[-1]["id"]
+            index.last_synced_id = max(index.last_synced_id, cursor)
+        if len(result.data) < _SYNC_PAGE_SIZE:
+            caught_up = True
+            break
+    index.flush()
+    return caught_up
+
+
+def _seen_index() -> SeenUrlIndex | None:
+    """The local Bloom filter of published URLs, without syncing it."""
+    global _seen, _seen_disabled
+    if _seen_disabled:
+        return None
+    with _seen_lock:
+        if _seen is None:
+            try:
+                _seen = SeenUrlIndex(SEEN_INDEX_PATH)
+            except OSError as exc:
+                print(f"[seen_index] Disabled, falling back to Supabase: {exc}")
+                _seen_disabled = True
+                return None
+    return _seen
+
+
+def _synced_seen_index() -> SeenUrlIndex | None:
+    """
+    The local index for lookups, synced every SEEN_INDEX_SYNC_SECONDS, or
+    None while it is still catching up with the table. A lookup never waits
+    for another thread's sync: it uses the index as it is.
+    """
+    global _seen_warm, _seen_synced_at
+    index = _seen_index()
+    if index is None:
+        return None
+    due = not _seen_warm or _seen_synced_at is None or time.monotonic() - _seen_synced_at >= SEEN_INDEX_SYNC_SECONDS
+    if due and _seen_sync_lock.acquire(blocking=False):
+        try:
+            caught_up = _sync_seen_index(index)
+            _seen_warm = _seen_warm or caught_up
+            _seen_synced_at = time.monotonic()
+        except Exception as exc:
+            # A stale index is still right about everything up to its last
+            # sync; a cold one is not used at all.
+            print(f"[seen_index] Sync failed: {exc}")
+        finally:
+            _seen_sync_lock.release()
+    return index if _seen_warm else None
+
+
+def rebuild_seen_index() -> dict:
+    """Drop the local index and rebuild it from the whole published_urls table."""
+    global _seen_warm, _seen_synced_at
+    index = _seen_index()
+    if index is None:
+        return {}
+    with _seen_sync_lock:
+        _seen_warm = False
+        index.clear()
+        _seen_warm = _sync_seen_index(index, max_pages=None)
+        _seen_synced_at = time.monotonic()
+    return index.stats()
+
+
+def seen_index_stats() -> dict:
+    index = _seen_index()
+    return {**index.stats(), "warm": _seen_warm} if index is not None else {}
+
+
+@timed("supabase.is_url_published")
 def is_url_published(url: str) -> bool:
+    index = _synced_seen_index()
+    if index is not None and url not in index:
+        return False
     client = get_client()
     result = client.table("published_urls").select("id").eq("url", url).limit(1).execute()
-    return len(result.data) > 0
+    found = len(result.data) > 0
+    if index is not None:
+        index.record_checks(1, 0 if found else 1)
+    return found
+
+
+# Keeps the PostgREST query string well under common URL length limits.
+_IN_CHUNK_SIZE = 30
+
+
+@timed("supabase.get_published_urls")
+def get_published_urls(urls: list[str]) -> set[str]:
+    """Return the subset of `urls` already in published_urls, one `in.(...)` query per chunk."""
+    unique = list(dict.fromkeys(urls))
+    # Only URLs the local index may have seen need a round trip.
+    index = _synced_seen_index()
+    if index is not None:
+        unique = [url for url in unique if url in index]
+    client = get_client()
+    published: set[str] = set()
+    for start in range(0, len(unique), _IN_CHUNK_SIZE):
+        chunk = unique[start:start + _IN_CHUNK_SIZE]
+        result = client.table("published_urls").select("url").in_("url", chunk).execute()
+        published.update(row["url"] for row in result.data)
+    if index is not None:
+        index.record_checks(len(unique), len(unique) - len(published))
+    return published
 
 
+@timed("supabase.log_published_url")
 def log_published_url(
     url: str,
     title: str,
@@ -34,14 +202,28 @@ def log_published_url(
         "category": category,
         "wp_post_id": wp_post_id,
     }).execute()
+    # The post is out and logged; a failing local index must not turn that
+    # into an error.
+    index = _seen_index()
+    if index is not None:
+        try:
+            index.add(url)
+            index.flush()
+        except Exception as exc:
+            print(f"[seen_index] Could not add {url}: {exc}")
 
 
+@timed("supabase.log_scrape_result")
 def log_scrape_result(
     source_site: str,
     articles_found: int,
     articles_published: int,
     articles_filtered: int,
     error: str | None = None,
+    duration_seconds: float | None = None,
+    pending_urls: list[str] | None = None,
+    metrics: dict | None = None,
+    articles_fetched: int | None = None,
 ) -> None:
     client = get_client()
     client.table("scrape_logs").insert({
@@ -49,10 +231,27 @@ def log_scrape_result(
         "articles_found": articles_found,
         "articles_published": articles_published,
         "articles_filtered": articles_filtered,
+        "articles_fetched": articles_fetched,
         "error": error,
+        "duration_seconds": duration_seconds,
+        "pending_urls": pending_urls or [],
+        "metrics": metrics or {},
     }).execute()
 
 
+def get_recent_scrape_logs(limit: int = 100) -> list[dict]:
+    """Latest scrape_logs rows across all sites, newest first."""
+    client = get_client()
+    result = (
+        client.table("scrape_logs")
+        .select("source_site,articles_published,articles_filtered,articles_fetched,duration_seconds")
+        .order("id", desc=True)
+        .limit(limit)
+        .execute()
+    )
+    return result.data
+
+
 def get_sources() -> list[dict]:
     client = get_client()
     result = client.table("sources").select("*").eq("active", True).execute()
@@ -70,3 +269,92 @@ def get_filter_keywords() -> list[str]:
     except Exception:
         pass
     return DEFAULT_BLACKLIST
+
+
+@timed("supabase.get_cached_media")
+def get_cached_media(wp_url: str, media_keys: list[str]) -> int | None:
+    client = get_client()
+    result = (
+        client.table("media_cache")
+        .select("media_id")
+        .eq("wp_url", wp_url)
+        .in_("media_key", media_keys)
+        .limit(1)
+        .execute()
+    )
+    return result.data[0]["media_id"] if result.data else None
+
+
+@timed("supabase.store_cached_media")
+def store_cached_media(wp_url: str, media_keys: list[str], media_id: int, source_url: str) -> None:
+    client = get_client()
+    client.table("media_cache").upsert(
+        [
+            {"wp_url": wp_url, "media_key": key, "media_id": media_id, "source_url": source_url}
+            for key in media_keys
+        ],
+        on_conflict="wp_url,media_key",
+    ).execute()
+
+
+@timed("supabase.delete_cached_media")
+def delete_cached_media(wp_url: str, media_id: int) -> None:
+    client = get_client()
+    client.table("media_cache").delete().eq("wp_url", wp_url).eq("media_id", media_id).execute()
+
+
+@timed("supabase.get_checkpoint_row")
+def get_checkpoint_row(source_site: str) -> dict | None:
+    client = get_client()
+    result = client.table("scrape_checkpoints").select("*").eq("source_site", source_site).limit(1).execute()
+    return result.data[0] if result.data else None
+
+
+@timed("supabase.upsert_checkpoint_row")
+def upsert_checkpoint_row(source_site: str, links: list[str], states: dict[str, str], started_at: float) -> None:
+    client = get_client()
+    client.table("scrape_checkpoints").upsert({
+        "source_site": source_site,
+        "links": links,
+        "states": states,
+        "started_at": started_at,
+    }, on_conflict="source_site").execute()
+
+
+@timed("supabase.delete_checkpoint_row")
+def delete_checkpoint_row(source_site: str) -> None:
+    client = get_client()
+    client.table("scrape_checkpoints").delete().eq("source_site", source_site).execute()
+
+
+@timed("supabase.get_story_bands")
+def get_story_bands(band_keys: list[str]) -> list[dict]:
+    client = get_client()
+    rows: list[dict] = []
+    # Band keys are short, so bigger chunks still fit the query string.
+    for start in range(0, len(band_keys), _IN_CHUNK_SIZE * 2):
+        chunk = band_keys[start:start + _IN_CHUNK_SIZE * 2]
+        result = (
+            client.table("story_fingerprints")
+            .select("band_key,url,source_site,title,signature,created_at")
+            .in_("band_key", chunk)
+            .execute()
+        )
+        rows.extend(result.data)
+    return rows
+
+
+@timed("supabase.claim_story_bands")
+def claim_story_bands(rows: list[dict]) -> dict[str, dict]:
+    """Insert the band rows nobody holds yet; returns the ones this call got, by band key."""
+    client = get_client()
+    result = client.table("story_fingerprints").upsert(
+        rows, on_conflict="band_key", ignore_duplicates=True
+    ).execute()
+    return {row["band_key"]: row for row in result.data or []}
+
+
+@timed("supabase.release_story_bands")
+def release_story_bands(url: str) -> None:
+    client = get_client()
+    client.table("story_fingerprints").delete().eq("url", url).execute()
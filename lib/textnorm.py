@@ -0,0 +1,68 @@
+import unicodedata
+from functools import lru_cache
+
+
+def _build_table() -> bytes:
+    # Latin-1 covers every Portuguese letter: map accented letters to their
+    # base letter, keep ASCII letters and digits, turn everything else into a
+    # space. Characters outside Latin-1 arrive as "?" and become spaces too.
+    table = bytearray(b" " * 256)
+    for code in range(256):
+        ch = chr(code)
+        if not ch.isalnum():
+            continue
+        base = unicodedata.normalize("NFKD", ch).encode("ascii", "ignore").decode().lower()
+        if len(base) == 1:
+            table[code] = ord(base)
+    return bytes(table)
+
+
+_TABLE = _build_table()
+# Punctuation a keyword may contain and still mean the same once it is
+# reduced to words: "covid-19" is the phrase "covid 19", but "c++" is not "c".
+_KEYWORD_SEPARATORS = frozenset("-'’./")
+
+
+def _compose(raw: str) -> str:
+    # Decomposed input (NFD, as pasted from macOS) spells "ã" as "a" plus a
+    # combining tilde, which the table would split into two words; composed,
+    # it is the Latin-1 letter the table folds. Checking is much cheaper than
+    # normalizing, and almost every text is already composed.
+    if not raw.isascii() and not unicodedata.is_normalized("NFC", raw):
+        raw = unicodedata.normalize("NFC", raw)
+    return raw.casefold()
+
+
+class NormalizedText:
+    """Casefolded, accent-free view of a text as space-separated tokens."""
+
+    __slots__ = ("text", "tokens")
+
+    def __init__(self, raw: str):
+        words = _compose(raw).encode("latin-1", "replace").translate(_TABLE).decode("ascii").split()
+        # Padded so that " phrase " lookups only hit on word boundaries.
+        self.text = " " + " ".join(words) + " "
+        self.tokens = frozenset(words)
+
+
+@lru_cache(maxsize=64)
+def normalize(raw: str) -> NormalizedText:
+    """
+    Normalize once per distinct text: the filter and the classifier both look
+    at the article title, which is therefore only processed once.
+    """
+    return NormalizedText(raw)
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    The keyword as normalized text, or "" when normalizing would change what
+    it means: texts lose symbols and letters outside Latin-1, so a keyword
+    made of them cannot be matched faithfully.
+    """
+    for ch in _compose(keyword):
+        if ch.isspace() or ch in _KEYWORD_SEPARATORS:
+            continue
+        if ord(ch) > 0xFF or _TABLE[ord(ch)] == ord(" "):
+            return ""
+    return normalize(keyword).text.strip()
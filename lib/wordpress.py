@@ -1,5 +1,41 @@
 import base64
-import requests
+import hashlib
+import html
+import threading
+import time
+
+from lib.http_session import get_session
+from lib.media_cache import content_key, find_media, forget_media, remember_media, source_key
+from lib.metrics import add_bytes, timed
+from lib.scheduler import request_timeout
+
+# Categories rarely change; refetch the full list for a site this often.
+CATEGORY_CACHE_TTL = 600
+
+_categories: dict[str, tuple[float, dict[str, int]]] = {}
+_categories_lock = threading.Lock()
+
+# A cached media ID is checked against the site before it is reused, since
+# the image may have been deleted from the media library; one that was found
+# is trusted for this long.
+MEDIA_CHECK_TTL = 600
+
+# Seconds past the run's deadline creating a post may take (the time budget
+# leaves room for it below the function's maxDuration).
+POST_TIMEOUT_GRACE = 5.0
+
+_media_checked: dict[tuple[str, int], float] = {}
+_media_checked_lock = threading.Lock()
+
+# Images are relayed from the source to /media without being held in memory.
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+_IMAGE_CHUNK_SIZE = 64 * 1024
+_IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
 
 
 def _auth_header(credentials: dict) -> dict[str, str]:
@@ -14,41 +50,205 @@ def _wp_url(credentials: dict, path: str) -> str:
     return f"{base}/wp-json/wp/v2/{path}"
 
 
-def get_or_create_category(name: str, credentials: dict) -> int:
+def _load_categories(credentials: dict) -> dict[str, int]:
     headers = _auth_header(credentials)
-    resp = requests.get(_wp_url(credentials, "categories"), params={"search": name}, headers=headers, timeout=15)
-    resp.raise_for_status()
-    for cat in resp.json():
-        if cat["name"].lower() == name.lower():
-            return cat["id"]
-    resp = requests.post(_wp_url(credentials, "categories"), json={"name": name}, headers=headers, timeout=15)
+    categories: dict[str, int] = {}
+    page = 1
+    while True:
+        resp = get_session().get(
+            _wp_url(credentials, "categories"),
+            params={"per_page": 100, "page": page, "_fields": "id,name"},
+            headers=headers,
+            timeout=request_timeout(15),
+        )
+        resp.raise_for_status()
+        for cat in resp.json():
+            categories[html.unescape(cat["name"]).lower()] = cat["id"]
+        if page >= int(resp.headers.get("X-WP-TotalPages", 1)):
+            return categories
+        page += 1
+
+
+def _create_category(name: str, credentials: dict) -> int:
+    headers = _auth_header(credentials)
+    resp = get_session().post(
+        _wp_url(credentials, "categories"), json={"name": name}, headers=headers, timeout=request_timeout(15)
+    )
+    if resp.status_code == 400:
+        # Created by someone else since our list was fetched.
+        error = resp.json()
+        if error.get("code") == "term_exists":
+            return error["data"]["term_id"]
     resp.raise_for_status()
     return resp.json()["id"]
 
 
+def get_or_create_category(name: str, credentials: dict) -> int:
+    site = credentials["wp_url"].rstrip("/")
+    with _categories_lock:
+        cached = _categories.get(site)
+        if cached is None or time.monotonic() - cached[0] > CATEGORY_CACHE_TTL:
+            cached = (time.monotonic(), _load_categories(credentials))
+            _categories[site] = cached
+        categories = cached[1]
+        category_id = categories.get(name.lower())
+        if category_id is None:
+            category_id = _create_category(name, credentials)
+            categories[name.lower()] = category_id
+    return category_id
+
+
+def _sniff_image_type(head: bytes) -> str | None:
+    for signature, content_type in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    return None
+
+
+def _media_exists(media_id: int, credentials: dict) -> bool:
+    site = credentials["wp_url"].rstrip("/")
+    with _media_checked_lock:
+        checked_at = _media_checked.get((site, media_id))
+    if checked_at is not None and time.monotonic() - checked_at < MEDIA_CHECK_TTL:
+        return True
+    try:
+        resp = get_session().get(
+            _wp_url(credentials, f"media/{media_id}"),
+            params={"_fields": "id"},
+            headers=_auth_header(credentials),
+            timeout=request_timeout(15),
+        )
+    except Exception:
+        # Can't tell; create_post will fail loudly if it really is gone.
+        return True
+    if resp.status_code in (404, 410):
+        return False
+    with _media_checked_lock:
+        _media_checked[(site, media_id)] = time.monotonic()
+    return True
+
+
+def _reusable_media(site: str, keys: list[str], credentials: dict) -> int | None:
+    media_id = find_media(site, keys)
+    if media_id is not None and not _media_exists(media_id, credentials):
+        print(f"[wordpress] Cached media {media_id} is gone from {site}, uploading again")
+        forget_media(site, media_id)
+        return None
+    return media_id
+
+
+class _ImageStream:
+    """Request body that relays the source image to WordPress chunk by chunk, hashing it on the way."""
+
+    def __init__(self, head: bytes, chunks, length: int | None):
+        self._head = head
+        self._chunks = chunks
+        self._length = length
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def __len__(self) -> int:
+        # 0 makes requests fall back to chunked transfer encoding.
+        return self._length or 0
+
+    def __bool__(self) -> bool:
+        # requests replaces a falsy body with {}; an unknown length is not empty.
+        return True
+
+    def _relay(self, chunk: bytes) -> bytes:
+        self.size += len(chunk)
+        if self.size > MAX_IMAGE_BYTES:
+            raise ValueError(f"image larger than {MAX_IMAGE_BYTES} bytes")
+        self.digest.update(chunk)
+        return chunk
+
+    def __iter__(self):
+        yield self._relay(self._head)
+        for chunk in self._chunks:
+            yield self._relay(chunk)
+
+
+def _delete_media(media_id: int, credentials: dict) -> None:
+    try:
+        get_session().delete(
+            _wp_url(credentials, f"media/{media_id}"),
+            params={"force": "true"},
+            headers=_auth_header(credentials),
+            timeout=request_timeout(15),
+        )
+    except Exception as exc:
+        print(f"[wordpress] Could not delete duplicate media {media_id}: {exc}")
+
+
+@timed("wordpress.upload_image")
 def upload_image(image_url: str, filename: str, credentials: dict) -> int | None:
+    site = credentials["wp_url"].rstrip("/")
     try:
-        img_resp = requests.get(image_url, timeout=15)
+        img_resp = get_session().get(image_url, timeout=request_timeout(15), stream=True)
         img_resp.raise_for_status()
     except Exception:
         return None
 
-    content_type = img_resp.headers.get("Content-Type", "image/jpeg")
-    headers = _auth_header(credentials)
-    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
-    headers["Content-Type"] = content_type
+    with img_resp:
+        # Same URL and ETag as an earlier upload: reuse it without downloading.
+        keys = [source_key(image_url, img_resp.headers.get("ETag"))]
+        media_id = _reusable_media(site, keys, credentials)
+        if media_id is not None:
+            return media_id
 
-    resp = requests.post(
-        _wp_url(credentials, "media"),
-        data=img_resp.content,
-        headers=headers,
-        timeout=30,
-    )
+        # Only a raw (not re-encoded) body has a length we can forward as is.
+        length = None
+        if img_resp.headers.get("Content-Encoding", "identity") == "identity":
+            length = int(img_resp.headers.get("Content-Length") or 0) or None
+        if length and length > MAX_IMAGE_BYTES:
+            return None
+
+        chunks = img_resp.iter_content(chunk_size=_IMAGE_CHUNK_SIZE)
+        try:
+            head = next(chunks, b"")
+        except Exception:
+            return None
+        content_type = _sniff_image_type(head)
+        if content_type is None:
+            declared = img_resp.headers.get("Content-Type", "").split(";")[0].strip()
+            if not declared.startswith("image/"):
+                return None
+            content_type = declared
+
+        headers = _auth_header(credentials)
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        headers["Content-Type"] = content_type
+        body = _ImageStream(head, chunks, length)
+        try:
+            resp = get_session().post(
+                _wp_url(credentials, "media"), data=body, headers=headers, timeout=request_timeout(30)
+            )
+        except Exception:
+            return None
     if not resp.ok:
         return None
-    return resp.json().get("id")
+    media_id = resp.json().get("id")
+    if media_id is None:
+        return None
+    add_bytes("wordpress.upload_image", body.size)
+
+    # The content hash is only known once the image went through, so the
+    # same image under another URL is caught after the upload: keep the
+    # older copy and drop the new one.
+    keys.append(content_key(body.digest.hexdigest()))
+    existing = _reusable_media(site, keys[1:], credentials)
+    if existing is not None and existing != media_id:
+        _delete_media(media_id, credentials)
+        media_id = existing
+    remember_media(site, keys, media_id, image_url)
+    return media_id
 
 
+@timed("wordpress.create_post")
 def create_post(
     title: str,
     content: str,
@@ -73,6 +273,13 @@ def create_post(
     if source_url:
         payload["meta"] = {"source_url": source_url}
 
-    resp = requests.post(_wp_url(credentials, "posts"), json=payload, headers=headers, timeout=30)
+    # A post cut off mid-request may still be created without us logging
+    # it, so this one may run a little past the deadline.
+    resp = get_session().post(
+        _wp_url(credentials, "posts"),
+        json=payload,
+        headers=headers,
+        timeout=request_timeout(30, grace=POST_TIMEOUT_GRACE),
+    )
     resp.raise_for_status()
     return resp.json()["id"]
@@ -0,0 +1,2 @@
+-- get_published_urls looks URLs up in batches with url=in.(...).
+create index if not exists published_urls_url_idx on published_urls (url);
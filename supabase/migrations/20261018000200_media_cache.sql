@@ -0,0 +1,10 @@
+-- WordPress media already uploaded, by source URL+ETag and by content hash
+-- (lib/media_cache.py).
+create table if not exists media_cache (
+    wp_url text not null,
+    media_key text not null,
+    media_id bigint not null,
+    source_url text,
+    created_at timestamptz not null default now(),
+    primary key (wp_url, media_key)
+);
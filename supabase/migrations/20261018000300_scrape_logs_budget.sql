@@ -0,0 +1,3 @@
+-- Run summaries: time taken and links left for the next run (lib/scheduler.py).
+alter table scrape_logs add column if not exists duration_seconds double precision;
+alter table scrape_logs add column if not exists pending_urls jsonb not null default '[]';
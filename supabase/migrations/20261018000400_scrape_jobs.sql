@@ -0,0 +1,10 @@
+-- Webhook jobs (lib/jobs.py), polled by the plugin through /api/webhook/status.
+create table if not exists scrape_jobs (
+    id text primary key,
+    status text not null,
+    secret_hash text,
+    result jsonb,
+    error text,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
@@ -0,0 +1,8 @@
+-- Listing snapshot of a site run cut off by its time budget (lib/checkpoint.py).
+create table if not exists scrape_checkpoints (
+    source_site text primary key,
+    links jsonb not null default '[]',
+    states jsonb not null default '{}',
+    -- Unix time, as written by time.time().
+    started_at double precision not null
+);
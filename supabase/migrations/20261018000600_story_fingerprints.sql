@@ -0,0 +1,11 @@
+-- MinHash band claims of published stories (lib/story_dedup.py). A band key
+-- starts with its day, so old rows can be dropped once out of the window.
+create table if not exists story_fingerprints (
+    band_key text primary key,
+    url text not null,
+    source_site text not null,
+    title text,
+    signature bigint[] not null,
+    created_at timestamptz not null default now()
+);
+create index if not exists story_fingerprints_url_idx on story_fingerprints (url);
@@ -0,0 +1,2 @@
+-- Per-stage timings of each run (lib/metrics.py).
+alter table scrape_logs add column if not exists metrics jsonb not null default '{}';
@@ -0,0 +1,3 @@
+-- Articles a run actually fetched, what the time budget's cost estimate
+-- divides by (lib/scheduler.py).
+alter table scrape_logs add column if not exists articles_fetched integer;
@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+import lib.checkpoint as checkpoint_module
+import lib.local_state as local_state
+import lib.scraper_base as scraper_base
+import lib.story_dedup as story_dedup
+from lib.checkpoint import FAILED, FETCHED, FILTERED, PUBLISHED, Checkpoint, load_checkpoint
+from lib.parsing import parse_html
+from lib.scheduler import Deadline, SiteSchedule
+
+
+def test_pending_skips_links_in_a_terminal_state():
+    checkpoint = Checkpoint(site="site", links=["a", "b", "c", "d"])
+    checkpoint.mark("a", PUBLISHED)
+    checkpoint.mark("b", FILTERED)
+    checkpoint.mark("c", FAILED)
+    checkpoint.mark("d", FETCHED)
+    assert checkpoint.pending() == ["d"]
+
+
+def test_expires_after_the_ttl():
+    assert not Checkpoint(site="site", links=[]).expired(ttl=60)
+    assert Checkpoint(site="site", links=[], started_at=time.time() - 61).expired(ttl=60)
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    """The scrape_checkpoints table, in memory."""
+    table: dict[str, dict] = {}
+    monkeypatch.setattr(checkpoint_module, "get_checkpoint_row", table.get)
+    monkeypatch.setattr(
+        checkpoint_module, "upsert_checkpoint_row",
+        lambda site, links, states, started_at: table.__setitem__(
+            site, {"links": links, "states": states, "started_at": started_at}
+        ),
+    )
+    monkeypatch.setattr(checkpoint_module, "delete_checkpoint_row", lambda site: table.pop(site, None))
+    return table
+
+
+def test_load_returns_a_saved_checkpoint_with_work_left(rows):
+    checkpoint = Checkpoint(site="site", links=["a", "b"])
+    checkpoint.mark("a", PUBLISHED)
+    checkpoint_module.save_checkpoint(checkpoint)
+
+    loaded = load_checkpoint("site")
+    assert loaded.pending() == ["b"]
+    assert loaded.persisted
+
+
+def test_load_drops_expired_and_finished_checkpoints(rows):
+    checkpoint_module.save_checkpoint(Checkpoint(site="old", links=["a"], started_at=time.time() - 3600))
+    done = Checkpoint(site="done", links=["a"])
+    done.mark("a", PUBLISHED)
+    checkpoint_module.save_checkpoint(done)
+
+    assert load_checkpoint("old", ttl=60) is None
+    assert load_checkpoint("done") is None
+    assert rows == {}
+
+
+def test_clear_only_deletes_a_persisted_checkpoint(rows):
+    rows["site"] = {"links": ["x"], "states": {}, "started_at": time.time()}
+    checkpoint_module.clear_checkpoint(Checkpoint(site="site", links=[]))
+    assert "site" in rows
+    checkpoint_module.clear_checkpoint(Checkpoint(site="site", links=[], persisted=True))
+    assert "site" not in rows
+
+
+class _Site(scraper_base.BaseScraper):
+    site_name = "example.com"
+    listing_url = "https://example.com/"
+    request_delay = 0
+    max_concurrency = 1
+    listed: list[str] = []
+
+    def fetch_listing(self, conditional=True):
+        return scraper_base.ListingPage(url=self.listing_url, soup=None, changed=True, validators={})
+
+    def read_listing(self, listing):
+        return list(self.listed), {}
+
+    def fetch(self, url):
+        return parse_html(f"<h1>{url}</h1><p>Texto completo de {url}.</p>")
+
+    def parse_article(self, soup, url):
+        title, body = soup.select_one("h1").get_text(), soup.select_one("p").get_text()
+        return scraper_base.Article(url=url, title=title, body=body, image_url=None)
+
+
+def test_resumed_run_publishes_new_links_before_the_leftovers(tmp_path, monkeypatch):
+    previous = Checkpoint(
+        site=_Site.site_name,
+        links=["https://example.com/old-1", "https://example.com/old-2", "https://example.com/old-3"],
+        states={"https://example.com/old-1": PUBLISHED},
+        started_at=time.time() - 60,
+        persisted=True,
+    )
+    published = []
+    saved = []
+    monkeypatch.setattr(local_state, "_state", local_state.LocalState(str(tmp_path / "state.json")))
+    monkeypatch.setattr(scraper_base, "load_checkpoint", lambda site: previous)
+    monkeypatch.setattr(scraper_base, "save_checkpoint", saved.append)
+    monkeypatch.setattr(scraper_base, "clear_checkpoint", lambda checkpoint: None)
+    monkeypatch.setattr(scraper_base, "get_published_urls", lambda urls: set())
+    monkeypatch.setattr(scraper_base, "upload_image", lambda *args: None)
+    monkeypatch.setattr(scraper_base, "create_post", lambda **kwargs: published.append(kwargs["source_url"]) or 1)
+    monkeypatch.setattr(scraper_base, "log_published_url", lambda **kwargs: None)
+    monkeypatch.setattr(scraper_base, "log_scrape_result", lambda **kwargs: None)
+    monkeypatch.setattr(story_dedup, "_index", story_dedup.StoryIndex())
+    monkeypatch.setattr(story_dedup, "get_story_bands", lambda keys: [])
+    monkeypatch.setattr(story_dedup, "claim_story_bands", lambda rows: {row["band_key"]: row for row in rows})
+    monkeypatch.setattr(story_dedup, "release_story_bands", lambda url: None)
+    monkeypatch.setattr(_Site, "listed", ["https://example.com/new-1", "https://example.com/old-3", "https://example.com/new-2"])
+
+    result = _Site().run({"wp_url": "https://wp.example"}, blacklist=[], schedule=SiteSchedule(Deadline(60)))
+
+    assert result.resumed and result.error is None
+    assert published == [
+        "https://example.com/new-1",
+        "https://example.com/old-3",
+        "https://example.com/new-2",
+        "https://example.com/old-2",
+    ]
+    # The merged checkpoint keeps the leftovers' age.
+    assert saved[-1].started_at == previous.started_at
@@ -0,0 +1,56 @@
+import unicodedata
+
+from lib.matcher import KeywordMatcher, get_matcher
+from lib.textnorm import normalize, normalize_keyword
+
+
+def test_matches_whole_words_only():
+    matcher = KeywordMatcher(["gol", "arma"])
+    assert matcher.matches("Governo anuncia golpe de mestre na farmácia") == set()
+    assert matcher.matches("Gol no fim do jogo") == {"gol"}
+    assert matcher.matches("Polícia apreende arma.") == {"arma"}
+
+
+def test_matches_plurals():
+    matcher = KeywordMatcher(["preso", "prisão"])
+    assert matcher.matches("Dois presos após prisões em série") == {"preso", "prisão"}
+
+
+def test_phrases_match_on_word_boundaries():
+    matcher = KeywordMatcher(["troca de tiros"])
+    assert matcher.matches("Houve troca de tiros no centro") == {"troca de tiros"}
+    assert matcher.matches("Houve troca de tirosina") == set()
+
+
+def test_accents_and_case_are_folded():
+    matcher = KeywordMatcher(["maceio", "São Miguel"])
+    assert matcher.matches("MACEIÓ e sao miguel dos campos") == {"maceio", "São Miguel"}
+
+
+def test_decomposed_text_is_folded_like_composed_text():
+    composed = "Ação policial em São Miguel"
+    decomposed = unicodedata.normalize("NFD", composed)
+    assert decomposed != composed
+    assert normalize(decomposed).text == normalize(composed).text == " acao policial em sao miguel "
+    matcher = KeywordMatcher(["ação", "sao miguel"])
+    assert matcher.matches(decomposed) == {"ação", "sao miguel"}
+
+
+def test_keywords_that_normalization_would_change_are_refused():
+    assert normalize_keyword("c++") == ""
+    assert normalize_keyword("R$") == ""
+    assert normalize_keyword("covid-19") == "covid 19"
+    matcher = KeywordMatcher(["c++", "", "covid-19"])
+    assert matcher.matches("Linguagem C e a covid-19") == {"covid-19"}
+
+
+def test_search_and_find_all():
+    matcher = KeywordMatcher(["tiro", "troca de tiros"])
+    assert matcher.search("nada a ver") is None
+    assert matcher.search("um tiro") == "tiro"
+    # Overlapping hits are all reported, positions in the normalized text.
+    assert matcher.find_all("Troca de tiros e um tiro") == [(0, "troca de tiros"), (9, "tiro"), (20, "tiro")]
+
+
+def test_get_matcher_reuses_the_compiled_matcher():
+    assert get_matcher(["a1", "b2"]) is get_matcher(["b2", "a1", ""])
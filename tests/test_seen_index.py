@@ -0,0 +1,116 @@
+import lib.supabase_client as supabase_client
+from lib.seen_index import SeenUrlIndex
+
+
+def test_added_urls_are_always_found(tmp_path):
+    index = SeenUrlIndex(str(tmp_path / "seen.bloom"), capacity=1000)
+    urls = [f"https://example.com/noticia/{i}" for i in range(1000)]
+    for url in urls:
+        index.add(url)
+    assert all(url in index for url in urls)
+    assert index.count == 1000
+
+
+def test_false_positive_rate_stays_near_the_target(tmp_path):
+    index = SeenUrlIndex(str(tmp_path / "seen.bloom"), capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        index.add(f"https://example.com/noticia/{i}")
+    false_positives = sum(f"https://example.com/outra/{i}" in index for i in range(20000))
+    assert false_positives / 20000 < 0.02
+    assert index.estimated_fp_rate() < 0.02
+
+
+def test_reopening_keeps_urls_and_sync_position(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    index = SeenUrlIndex(path)
+    index.add("https://example.com/a")
+    index.last_synced_id = 42
+    index.flush()
+
+    reopened = SeenUrlIndex(path)
+    assert "https://example.com/a" in reopened
+    assert reopened.last_synced_id == 42
+    assert reopened.count == 1
+
+
+def test_a_corrupt_file_is_recreated_empty(tmp_path):
+    path = tmp_path / "seen.bloom"
+    path.write_bytes(b"not a bloom filter")
+    index = SeenUrlIndex(str(path))
+    assert "https://example.com/a" not in index
+    assert index.count == 0 and index.last_synced_id == 0
+    index.add("https://example.com/a")
+    assert "https://example.com/a" in index
+
+
+def test_clear_forgets_everything(tmp_path):
+    index = SeenUrlIndex(str(tmp_path / "seen.bloom"))
+    index.add("https://example.com/a")
+    index.last_synced_id = 7
+    index.clear()
+    assert "https://example.com/a" not in index
+    assert index.count == 0 and index.last_synced_id == 0
+
+
+class _PublishedUrls:
+    """Just enough of the PostgREST query builder for published_urls reads."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def table(self, name):
+        self._filters = {}
+        return self
+
+    def select(self, columns):
+        return self
+
+    def gt(self, column, value):
+        self._filters["gt"] = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, count):
+        self._filters["limit"] = count
+        return self
+
+    def in_(self, column, values):
+        self._filters["in"] = values
+        return self
+
+    def execute(self):
+        self.queries.append(dict(self._filters))
+        if "in" in self._filters:
+            data = [{"url": row["url"]} for row in self.rows if row["url"] in self._filters["in"]]
+        else:
+            data = [row for row in self.rows if row["id"] > self._filters["gt"]][: self._filters["limit"]]
+        return type("Result", (), {"data": data})()
+
+
+def test_cold_index_catches_up_a_few_pages_per_lookup(tmp_path, monkeypatch):
+    # Nine pages of 100: a sync reads five, and rereads the overlap first.
+    client = _PublishedUrls([{"id": i, "url": f"https://example.com/{i}"} for i in range(1, 901)])
+    monkeypatch.setattr(supabase_client, "get_client", lambda: client)
+    monkeypatch.setattr(supabase_client, "SEEN_INDEX_PATH", str(tmp_path / "seen.bloom"))
+    monkeypatch.setattr(supabase_client, "_SYNC_PAGE_SIZE", 100)
+    monkeypatch.setattr(supabase_client, "SEEN_INDEX_SYNC_OVERLAP", 200)
+    for name, value in (("_seen", None), ("_seen_disabled", False), ("_seen_warm", False), ("_seen_synced_at", None)):
+        monkeypatch.setattr(supabase_client, name, value)
+
+    # Until the index reached the end of the table, lookups ask Supabase
+    # about every URL, so nothing published is missed.
+    for _ in range(2):
+        assert supabase_client.get_published_urls(["https://example.com/850", "https://example.com/x"]) == {
+            "https://example.com/850"
+        }
+        assert client.queries[-1]["in"] == ["https://example.com/850", "https://example.com/x"]
+
+    # The third page was short: the index is warm and filters lookups itself.
+    assert supabase_client.get_published_urls(["https://example.com/850", "https://example.com/x"]) == {
+        "https://example.com/850"
+    }
+    assert client.queries[-1]["in"] == ["https://example.com/850"]
+    assert supabase_client.seen_index_stats()["warm"] is True
@@ -0,0 +1,71 @@
+import pytest
+
+import lib.story_dedup as story_dedup
+from lib.story_dedup import claim_story, find_duplicate, signature, similarity
+
+BODY = (
+    "A Prefeitura de Maceió anunciou nesta segunda-feira a ampliação do horário de "
+    "funcionamento das unidades de saúde da parte alta da cidade, que passam a atender "
+    "até as 22 horas a partir do próximo mês, segundo a secretaria municipal de saúde."
+)
+REWRITE = BODY.replace("segundo a secretaria", "informou a secretaria")
+OTHER = (
+    "O time alagoano venceu por dois a zero no Estádio Rei Pelé e assumiu a liderança "
+    "do grupo, com gols marcados no segundo tempo depois de uma primeira etapa equilibrada."
+)
+
+
+def test_signature_is_stable_and_none_for_empty_texts():
+    assert signature("Título", BODY) == signature("Título", BODY)
+    assert signature("", "") is None
+
+
+def test_rewrites_of_a_story_score_above_the_threshold_and_others_below():
+    original = signature("Saúde amplia horário", BODY)
+    rewrite = signature("Saúde amplia horário de atendimento", REWRITE)
+    assert similarity(original, rewrite) >= story_dedup.DUPLICATE_THRESHOLD
+    assert similarity(original, signature("Time assume liderança", OTHER)) < 0.2
+
+
+@pytest.fixture
+def bands(monkeypatch):
+    """The story_fingerprints table, in memory, with a fresh process index."""
+    table: dict[str, dict] = {}
+
+    def claim(rows):
+        for row in rows:
+            table.setdefault(row["band_key"], {**row, "created_at": None})
+        # Only the rows this claim inserted, like an insert that ignores duplicates.
+        return {row["band_key"]: table[row["band_key"]] for row in rows if table[row["band_key"]]["url"] == row["url"]}
+
+    monkeypatch.setattr(story_dedup, "_index", story_dedup.StoryIndex())
+    monkeypatch.setattr(story_dedup, "get_story_bands", lambda keys: [table[key] for key in keys if key in table])
+    monkeypatch.setattr(story_dedup, "claim_story_bands", claim)
+    monkeypatch.setattr(
+        story_dedup, "release_story_bands",
+        lambda url: [table.pop(key) for key in [key for key, row in table.items() if row["url"] == url]],
+    )
+    return table
+
+
+def test_a_claimed_story_keeps_its_rewrite_out(bands):
+    sig, duplicate = find_duplicate("https://a.com/1", "Saúde amplia horário", BODY)
+    assert duplicate is None
+    assert claim_story("https://a.com/1", "a.com", "Saúde amplia horário", sig) is None
+
+    rewrite_sig, duplicate = find_duplicate("https://b.com/9", "Saúde amplia horário de atendimento", REWRITE)
+    assert duplicate is not None and duplicate.url == "https://a.com/1" and duplicate.source_site == "a.com"
+    duplicate = claim_story("https://b.com/9", "b.com", "Saúde amplia horário de atendimento", rewrite_sig)
+    assert duplicate.url == "https://a.com/1"
+
+    other_sig, duplicate = find_duplicate("https://b.com/10", "Time assume liderança", OTHER)
+    assert duplicate is None
+    assert claim_story("https://b.com/10", "b.com", "Time assume liderança", other_sig) is None
+
+
+def test_a_released_claim_frees_the_story(bands):
+    sig = signature("Saúde amplia horário", BODY)
+    assert claim_story("https://a.com/1", "a.com", "Saúde amplia horário", sig) is None
+    story_dedup.release_story("https://a.com/1")
+    assert not bands
+    assert find_duplicate("https://b.com/9", "Saúde amplia horário de atendimento", REWRITE)[1] is None